@@ -0,0 +1,52 @@
+# Copyright (C) CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from collections.abc import Sequence
+
+from django.db import migrations
+
+
+class BatchedOnPostgreSQL(migrations.SeparateDatabaseAndState):
+    """
+    Records the wrapped operations in the migration state, but on PostgreSQL
+    replaces their per-field DDL with the given pre-batched SQL statements.
+    Other database backends (e.g. SQLite in tests) apply the wrapped operations as usual.
+    """
+
+    def __init__(
+        self,
+        operations: Sequence[migrations.operations.base.Operation],
+        sql: Sequence[str],
+        reverse_sql: Sequence[str],
+    ):
+        super().__init__(database_operations=operations, state_operations=operations)
+        self.operations = operations
+        self.sql = sql
+        self.reverse_sql = reverse_sql
+
+    def deconstruct(self):
+        return (
+            self.__class__.__qualname__,
+            [],
+            {"operations": self.operations, "sql": self.sql, "reverse_sql": self.reverse_sql},
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+        # Statements are executed one by one: CREATE INDEX CONCURRENTLY
+        # can't be a part of a multi-statement query
+        for statement in self.sql:
+            schema_editor.execute(statement, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+        for statement in self.reverse_sql:
+            schema_editor.execute(statement, params=None)
+
+    def describe(self):
+        return "Batched update of " + ", ".join(op.describe() for op in self.operations)
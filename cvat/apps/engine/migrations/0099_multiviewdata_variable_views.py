@@ -3,121 +3,101 @@
 from django.db import migrations, models
 import django.db.models.deletion
 
+from cvat.apps.engine.migration_utils import BatchedOnPostgreSQL
+
+
+# Existing views that become optional and views added by this migration
+OPTIONAL_VIEWS = range(2, 6)
+NEW_VIEWS = range(6, 11)
+
+
+def video_view_field(i):
+    return models.ForeignKey(
+        blank=True,
+        null=True,
+        on_delete=django.db.models.deletion.CASCADE,
+        related_name=f'multiview_view{i}',
+        to='engine.video'
+    )
+
+
+# A single ALTER TABLE rewrites and locks the table once instead of once per field.
+# FK indexes are built afterwards without blocking writes.
+# The migration is not atomic, so every statement can be safely repeated
+# if a previous run has failed in the middle.
+FORWARD_SQL = [
+    'ALTER TABLE "engine_multiviewdata" '
+        'ADD COLUMN IF NOT EXISTS "view_count" smallint DEFAULT 5 NOT NULL CHECK ("view_count" >= 0), '
+        + ''.join(f'ALTER COLUMN "video_view{i}_id" DROP NOT NULL, ' for i in OPTIONAL_VIEWS)
+        + ', '.join(
+            f'ADD COLUMN IF NOT EXISTS "video_view{i}_id" integer NULL '
+            f'CONSTRAINT "engine_multiviewdata_video_view{i}_id_fk_engine_video_id" '
+            'REFERENCES "engine_video" ("id") DEFERRABLE INITIALLY DEFERRED'
+            for i in NEW_VIEWS
+        ),
+    # The default is only needed to fill existing rows, Django doesn't keep it in the DB
+    'ALTER TABLE "engine_multiviewdata" ALTER COLUMN "view_count" DROP DEFAULT',
+    *(
+        statement
+        for i in NEW_VIEWS
+        for statement in (
+            # A failed concurrent build leaves an invalid index behind, rebuild it
+            f'DROP INDEX CONCURRENTLY IF EXISTS "engine_multiviewdata_video_view{i}_id_idx"',
+            f'CREATE INDEX CONCURRENTLY "engine_multiviewdata_video_view{i}_id_idx" '
+            f'ON "engine_multiviewdata" ("video_view{i}_id")',
+        )
+    ),
+]
+
+# Dropping the columns also drops their indexes and FK constraints.
+# Restoring NOT NULL fails if there are tasks with fewer than 5 views,
+# they can't be represented before this migration.
+REVERSE_SQL = [
+    'ALTER TABLE "engine_multiviewdata" '
+        + ', '.join(f'DROP COLUMN IF EXISTS "video_view{i}_id"' for i in reversed(NEW_VIEWS))
+        + ''.join(f', ALTER COLUMN "video_view{i}_id" SET NOT NULL' for i in reversed(OPTIONAL_VIEWS))
+        + ', DROP COLUMN IF EXISTS "view_count"',
+]
 
 class Migration(migrations.Migration):
+    # Required for CREATE INDEX CONCURRENTLY
+    atomic = False
 
     dependencies = [
         ('engine', '0098_labeledtrack_view_id'),
     ]
 
     operations = [
-        # Add view_count field with default=5 for backward compatibility
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='view_count',
-            field=models.PositiveSmallIntegerField(default=5),
-        ),
+        BatchedOnPostgreSQL(
+            sql=FORWARD_SQL,
+            reverse_sql=REVERSE_SQL,
+            operations=[
+                # Add view_count field with default=5 for backward compatibility
+                migrations.AddField(
+                    model_name='multiviewdata',
+                    name='view_count',
+                    field=models.PositiveSmallIntegerField(default=5),
+                ),
 
-        # Make existing view2-5 nullable
-        migrations.AlterField(
-            model_name='multiviewdata',
-            name='video_view2',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view2',
-                to='engine.video'
-            ),
-        ),
-        migrations.AlterField(
-            model_name='multiviewdata',
-            name='video_view3',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view3',
-                to='engine.video'
-            ),
-        ),
-        migrations.AlterField(
-            model_name='multiviewdata',
-            name='video_view4',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view4',
-                to='engine.video'
-            ),
-        ),
-        migrations.AlterField(
-            model_name='multiviewdata',
-            name='video_view5',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view5',
-                to='engine.video'
-            ),
-        ),
+                # Make existing view2-5 nullable
+                *(
+                    migrations.AlterField(
+                        model_name='multiviewdata',
+                        name=f'video_view{i}',
+                        field=video_view_field(i),
+                    )
+                    for i in OPTIONAL_VIEWS
+                ),
 
-        # Add new view6-10 fields (all nullable)
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='video_view6',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view6',
-                to='engine.video'
-            ),
-        ),
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='video_view7',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view7',
-                to='engine.video'
-            ),
-        ),
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='video_view8',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view8',
-                to='engine.video'
-            ),
-        ),
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='video_view9',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view9',
-                to='engine.video'
-            ),
-        ),
-        migrations.AddField(
-            model_name='multiviewdata',
-            name='video_view10',
-            field=models.ForeignKey(
-                blank=True,
-                null=True,
-                on_delete=django.db.models.deletion.CASCADE,
-                related_name='multiview_view10',
-                to='engine.video'
-            ),
+                # Add new view6-10 fields (all nullable)
+                *(
+                    migrations.AddField(
+                        model_name='multiviewdata',
+                        name=f'video_view{i}',
+                        field=video_view_field(i),
+                    )
+                    for i in NEW_VIEWS
+                ),
+            ],
         ),
     ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.26 on 2026-10-15 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+MAX_VIEWS = 10
+BATCH_SIZE = 5000
+
+
+def copy_views_to_table(apps, schema_editor):
+    MultiviewData = apps.get_model('engine', 'MultiviewData')
+    MultiviewDataView = apps.get_model('engine', 'MultiviewDataView')
+
+    view_fields = [f'video_view{i}' for i in range(1, MAX_VIEWS + 1)]
+    db_multiviews = (
+        MultiviewData.objects
+        .only('id', 'view_count', *view_fields)
+        .order_by('id')
+        .iterator(chunk_size=2000)
+    )
+
+    db_views = []
+    # view_count defaulted to 5 for rows that existed before 0099,
+    # so it is recalculated from the populated view columns
+    db_outdated = []
+    for db_multiview in db_multiviews:
+        view_count = 0
+        for view_index in range(1, MAX_VIEWS + 1):
+            video_id = getattr(db_multiview, f'video_view{view_index}_id')
+            if video_id is not None:
+                db_views.append(MultiviewDataView(
+                    multiview_id=db_multiview.id, view_index=view_index, video_id=video_id
+                ))
+                view_count = view_index
+
+        if db_multiview.view_count != view_count:
+            db_multiview.view_count = view_count
+            db_outdated.append(db_multiview)
+
+        if len(db_views) >= BATCH_SIZE:
+            MultiviewDataView.objects.bulk_create(db_views, batch_size=BATCH_SIZE)
+            db_views.clear()
+
+        if len(db_outdated) >= BATCH_SIZE:
+            MultiviewData.objects.bulk_update(db_outdated, ['view_count'], batch_size=BATCH_SIZE)
+            db_outdated.clear()
+
+    if db_views:
+        MultiviewDataView.objects.bulk_create(db_views, batch_size=BATCH_SIZE)
+
+    if db_outdated:
+        MultiviewData.objects.bulk_update(db_outdated, ['view_count'], batch_size=BATCH_SIZE)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0100_multiviewdata_original_files'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultiviewDataView',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_index', models.PositiveSmallIntegerField()),
+                ('multiview', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='views',
+                    to='engine.multiviewdata'
+                )),
+                ('video', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='multiview_views',
+                    to='engine.video'
+                )),
+            ],
+            options={
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='multiviewdataview',
+            constraint=models.UniqueConstraint(
+                fields=('multiview', 'view_index'),
+                name='multiviewdataview_multiview_view_index_unique'
+            ),
+        ),
+        migrations.RunPython(
+            copy_views_to_table,
+            reverse_code=migrations.RunPython.noop,  # the table is dropped on rollback
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.26 on 2026-10-15 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from cvat.apps.engine.migration_utils import BatchedOnPostgreSQL
+
+MAX_VIEWS = 10
+BATCH_SIZE = 2000
+
+
+def restore_view_columns(apps, schema_editor):
+    MultiviewData = apps.get_model('engine', 'MultiviewData')
+
+    view_fields = [f'video_view{i}' for i in range(1, MAX_VIEWS + 1)]
+    db_multiviews = (
+        MultiviewData.objects
+        .prefetch_related('views')
+        .order_by('id')
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+
+    updated = []
+    for db_multiview in db_multiviews:
+        for db_view in db_multiview.views.all():
+            setattr(db_multiview, f'video_view{db_view.view_index}_id', db_view.video_id)
+        updated.append(db_multiview)
+
+        if len(updated) >= BATCH_SIZE:
+            MultiviewData.objects.bulk_update(updated, view_fields, batch_size=BATCH_SIZE)
+            updated.clear()
+
+    if updated:
+        MultiviewData.objects.bulk_update(updated, view_fields, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0101_multiviewdataview'),
+    ]
+
+    operations = [
+        # On rollback, video_view1 can only be made required again
+        # after the columns are refilled from the views table
+        BatchedOnPostgreSQL(
+            sql=['ALTER TABLE "engine_multiviewdata" ALTER COLUMN "video_view1_id" DROP NOT NULL'],
+            reverse_sql=[
+                # Refilled rows leave deferred FK checks pending, which blocks ALTER TABLE
+                'SET CONSTRAINTS ALL IMMEDIATE',
+                'ALTER TABLE "engine_multiviewdata" ALTER COLUMN "video_view1_id" SET NOT NULL',
+                'SET CONSTRAINTS ALL DEFERRED',
+            ],
+            operations=[
+                migrations.AlterField(
+                    model_name='multiviewdata',
+                    name='video_view1',
+                    field=models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='multiview_view1',
+                        to='engine.video'
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            reverse_code=restore_view_columns,
+        ),
+        BatchedOnPostgreSQL(
+            sql=[
+                'ALTER TABLE "engine_multiviewdata" ' + ', '.join(
+                    f'DROP COLUMN "video_view{i}_id"' for i in range(1, MAX_VIEWS + 1)
+                ),
+            ],
+            reverse_sql=[
+                'ALTER TABLE "engine_multiviewdata" ' + ', '.join(
+                    f'ADD COLUMN "video_view{i}_id" integer NULL '
+                    f'CONSTRAINT "engine_multiviewdata_video_view{i}_id_fk_engine_video_id" '
+                    'REFERENCES "engine_video" ("id") DEFERRABLE INITIALLY DEFERRED'
+                    for i in range(1, MAX_VIEWS + 1)
+                ),
+                *(
+                    f'CREATE INDEX "engine_multiviewdata_video_view{i}_id_idx" '
+                    f'ON "engine_multiviewdata" ("video_view{i}_id")'
+                    for i in range(1, MAX_VIEWS + 1)
+                ),
+            ],
+            operations=[
+                migrations.RemoveField(
+                    model_name='multiviewdata',
+                    name=f'video_view{i}',
+                )
+                for i in range(1, MAX_VIEWS + 1)
+            ],
+        ),
+    ]
@@ -435,20 +435,6 @@ class MultiviewData(models.Model):
     data = models.OneToOneField(Data, on_delete=models.CASCADE, related_name="multiview_data")
     view_count = models.PositiveSmallIntegerField(default=5)  # Number of active views (1-10)
 
-    # view1 is required
-    video_view1 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view1")
-
-    # view2-10 are optional (null allowed)
-    video_view2 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view2", null=True, blank=True)
-    video_view3 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view3", null=True, blank=True)
-    video_view4 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view4", null=True, blank=True)
-    video_view5 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view5", null=True, blank=True)
-    video_view6 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view6", null=True, blank=True)
-    video_view7 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view7", null=True, blank=True)
-    video_view8 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view8", null=True, blank=True)
-    video_view9 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view9", null=True, blank=True)
-    video_view10 = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_view10", null=True, blank=True)
-
     session_id = models.CharField(max_length=64)
     part_number = models.IntegerField()
 
@@ -456,17 +442,29 @@ class MultiviewData(models.Model):
     # Structure: {"view1": {"filename": "camera1.mp4", "path": "/original/path"}, ...}
     original_files = models.JSONField(default=dict, blank=True)
 
+    views: models.manager.RelatedManager[MultiviewDataView]
+
     class Meta:
         default_permissions = ()
 
     def get_active_videos(self):
-        """Return list of non-null video views in order."""
-        videos = []
-        for i in range(1, 11):
-            video = getattr(self, f'video_view{i}', None)
-            if video:
-                videos.append(video)
-        return videos
+        """Return list of video views in order."""
+        return [view.video for view in self.views.select_related('video').order_by('view_index')]
+
+
+class MultiviewDataView(models.Model):
+    multiview = models.ForeignKey(MultiviewData, on_delete=models.CASCADE, related_name="views")
+    view_index = models.PositiveSmallIntegerField()  # 1-based, matches "video_view{N}" upload fields
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name="multiview_views")
+
+    class Meta:
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                name='multiviewdataview_multiview_view_index_unique',
+                fields=('multiview', 'view_index'),
+            ),
+        ]
 
 
 class Image(models.Model):
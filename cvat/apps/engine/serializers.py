@@ -2970,14 +2970,23 @@ class PluginsSerializer(serializers.Serializer):
     PREDICT = serializers.BooleanField()
 
 class MultiviewDataSerializer(serializers.ModelSerializer):
+    MAX_VIEWS = 10
+
     class Meta:
         model = models.MultiviewData
-        fields = ['id', 'session_id', 'part_number', 'view_count', 'original_files',
-                  'video_view1', 'video_view2', 'video_view3',
-                  'video_view4', 'video_view5', 'video_view6',
-                  'video_view7', 'video_view8', 'video_view9', 'video_view10']
+        fields = ['id', 'session_id', 'part_number', 'view_count', 'original_files']
         read_only_fields = ['id', 'original_files']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+
+        # Keep the flat "video_viewN": <video id> layout of the response
+        video_ids = {view.view_index: view.video_id for view in instance.views.all()}
+        for i in range(1, self.MAX_VIEWS + 1):
+            data[f'video_view{i}'] = video_ids.get(i)
+
+        return data
+
 class DataMetaReadSerializer(serializers.ModelSerializer):
     frames = FrameMetaSerializer(many=True, allow_null=True)
     chapters = ChapterSerializer(many=True, allow_null=True, required=False)
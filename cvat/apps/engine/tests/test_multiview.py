@@ -0,0 +1,191 @@
+# Copyright (C) CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os.path as osp
+import shutil
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from rest_framework import status
+
+from cvat.apps.dataset_manager.annotation import AnnotationIR
+from cvat.apps.dataset_manager.bindings import JobData
+from cvat.apps.engine import models
+from cvat.apps.engine.tests.utils import ApiTestBase, generate_video_file
+
+MAX_VIEWS = 10
+
+
+class MultiviewTaskApiTestCase(ApiTestBase):
+    @classmethod
+    def setUpTestData(cls):
+        group_admin, _ = Group.objects.get_or_create(name="admin")
+        cls.admin = User.objects.create_superuser(username="admin", email="", password="admin")
+        cls.admin.groups.add(group_admin)
+
+    def tearDown(self):
+        for task_id in models.Task.objects.values_list("id", flat=True):
+            shutil.rmtree(
+                osp.join(settings.DATA_ROOT, "multiview", str(task_id)), ignore_errors=True
+            )
+        super().tearDown()
+
+    def _create_multiview_task(self, view_count):
+        data = {
+            "name": "multiview task",
+            "session_id": "100",
+            "part_number": 1,
+            "view_count": view_count,
+        }
+        for i in range(1, view_count + 1):
+            _, data[f"video_view{i}"] = generate_video_file(
+                f"100-View{i}-Part1.mp4", width=64, height=48
+            )
+
+        response = self._post_request(
+            "/api/tasks/create_multiview", self.admin, format="multipart", data=data
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return models.Task.objects.get(id=response.json()["id"])
+
+    def test_can_create_view_rows(self):
+        db_task = self._create_multiview_task(view_count=3)
+
+        db_multiview = db_task.data.multiview_data
+        self.assertEqual(db_multiview.view_count, 3)
+        self.assertEqual(
+            list(db_multiview.views.order_by("view_index").values_list("view_index", flat=True)),
+            [1, 2, 3],
+        )
+        for db_view in db_multiview.views.select_related("video"):
+            self.assertEqual(osp.basename(db_view.video.path), f"view{db_view.view_index}.mp4")
+
+    def test_can_get_flat_view_ids(self):
+        db_task = self._create_multiview_task(view_count=3)
+        video_ids = {
+            db_view.view_index: db_view.video_id
+            for db_view in db_task.data.multiview_data.views.all()
+        }
+
+        response = self._get_request(f"/api/tasks/{db_task.id}/multiview_data", self.admin)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()
+        self.assertEqual(data["view_count"], 3)
+        for i in range(1, MAX_VIEWS + 1):
+            self.assertEqual(data[f"video_view{i}"], video_ids.get(i))
+        for i in range(4, MAX_VIEWS + 1):
+            self.assertIsNone(data[f"video_view{i}"])
+
+    def test_export_meta_ignores_views_after_view_count(self):
+        db_task = self._create_multiview_task(view_count=3)
+
+        # A view row left behind after view_count was reduced
+        db_multiview = db_task.data.multiview_data
+        db_video = models.Video.objects.create(
+            data=db_task.data, path="/tmp/view4.mp4", width=64, height=48
+        )
+        models.MultiviewDataView.objects.create(
+            multiview=db_multiview, view_index=4, video=db_video
+        )
+
+        db_job = models.Job.objects.get(segment__task=db_task)
+        job_data = JobData(AnnotationIR(db_task.dimension), db_job)
+
+        multiview_meta = job_data.meta["multiview"]
+        self.assertEqual(multiview_meta["view_count"], "3")
+        self.assertEqual([view["id"] for _, view in multiview_meta["views"]], ["1", "2", "3"])
+        self.assertEqual(
+            [view["original_filename"] for _, view in multiview_meta["views"]],
+            [f"100-View{i}-Part1.mp4" for i in range(1, 4)],
+        )
+
+
+class MultiviewDataViewMigrationTestCase(TransactionTestCase):
+    app = "engine"
+    before_copy = "0100_multiviewdata_original_files"
+    after_copy = "0101_multiviewdataview"
+
+    def _migrate(self, migration):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([(self.app, migration)])
+        return executor.loader.project_state([(self.app, migration)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def _create_videos(self, apps, count):
+        Data = apps.get_model(self.app, "Data")
+        Video = apps.get_model(self.app, "Video")
+
+        db_data = Data.objects.create(deleted_frames=[])
+        db_videos = [
+            Video.objects.create(data=db_data, path=f"/tmp/view{i}.mp4", width=64, height=48)
+            for i in range(1, count + 1)
+        ]
+        return db_data, db_videos
+
+    def test_copy_views_to_table(self):
+        apps = self._migrate(self.before_copy)
+        MultiviewData = apps.get_model(self.app, "MultiviewData")
+
+        # Rows created before 0099 keep the default view_count of 5
+        # and rows may have gaps between the populated views
+        db_data, db_videos = self._create_videos(apps, 3)
+        db_multiview = MultiviewData.objects.create(
+            data=db_data,
+            session_id="100",
+            part_number=1,
+            video_view1=db_videos[0],
+            video_view2=db_videos[1],
+            video_view4=db_videos[2],
+        )
+        self.assertEqual(db_multiview.view_count, 5)
+
+        apps = self._migrate(self.after_copy)
+        MultiviewData = apps.get_model(self.app, "MultiviewData")
+        MultiviewDataView = apps.get_model(self.app, "MultiviewDataView")
+
+        self.assertEqual(MultiviewData.objects.get(id=db_multiview.id).view_count, 4)
+        self.assertEqual(
+            list(
+                MultiviewDataView.objects.filter(multiview_id=db_multiview.id)
+                .order_by("view_index")
+                .values_list("view_index", "video_id")
+            ),
+            [(1, db_videos[0].id), (2, db_videos[1].id), (4, db_videos[2].id)],
+        )
+
+    def test_restore_view_columns(self):
+        executor = MigrationExecutor(connection)
+        (latest,) = [name for app, name in executor.loader.graph.leaf_nodes() if app == self.app]
+        apps = self._migrate(latest)
+        MultiviewData = apps.get_model(self.app, "MultiviewData")
+        MultiviewDataView = apps.get_model(self.app, "MultiviewDataView")
+
+        db_data, db_videos = self._create_videos(apps, 3)
+        db_multiview = MultiviewData.objects.create(
+            data=db_data, session_id="100", part_number=1, view_count=3
+        )
+        MultiviewDataView.objects.bulk_create(
+            [
+                MultiviewDataView(multiview_id=db_multiview.id, view_index=i, video_id=db_video.id)
+                for i, db_video in enumerate(db_videos, 1)
+            ]
+        )
+
+        apps = self._migrate(self.after_copy)
+        MultiviewData = apps.get_model(self.app, "MultiviewData")
+
+        db_multiview = MultiviewData.objects.get(id=db_multiview.id)
+        for i in range(1, MAX_VIEWS + 1):
+            expected = db_videos[i - 1].id if i <= len(db_videos) else None
+            self.assertEqual(getattr(db_multiview, f"video_view{i}_id"), expected)
@@ -1780,19 +1780,21 @@ class TaskViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
                     video_objects[view_key] = video_obj
 
                 # Create MultiviewData linking provided videos
-                multiview_kwargs = {
-                    'data': data_obj,
-                    'session_id': session_id,
-                    'part_number': int(part_number),
-                    'view_count': view_count,
-                    'video_view1': video_objects['video_view1'],
-                    'original_files': original_files,  # Include original file metadata
-                }
-                # Add optional views (2-10) if provided
-                for i in range(2, view_count + 1):
-                    multiview_kwargs[f'video_view{i}'] = video_objects.get(f'video_view{i}')
-
-                multiview_data = models.MultiviewData.objects.create(**multiview_kwargs)
+                multiview_data = models.MultiviewData.objects.create(
+                    data=data_obj,
+                    session_id=session_id,
+                    part_number=int(part_number),
+                    view_count=view_count,
+                    original_files=original_files,  # Include original file metadata
+                )
+                models.MultiviewDataView.objects.bulk_create([
+                    models.MultiviewDataView(
+                        multiview=multiview_data,
+                        view_index=i,
+                        video=video_objects[f'video_view{i}'],
+                    )
+                    for i in range(1, view_count + 1)
+                ])
 
                 # Use actual frame count from first video (all should be synchronized)
                 # In multiview setup, all videos should have the same frame count
@@ -0,0 +1,90 @@
+"""
+HTTP Helpers
+
+scripts/init의 task 생성 스크립트들이 공유하는 업로드/인증 유틸리티입니다.
+각 스크립트는 이 파일과 같은 디렉토리에서 실행되므로 `from _http import ...`로 사용합니다.
+"""
+
+import hashlib
+import mmap
+import os
+import random
+from pathlib import Path
+from typing import Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 업로드 시 파일에서 읽어 소켓에 한 번에 쓰는 크기 (urllib3 기본값 16KB)
+UPLOAD_BLOCKSIZE = 1024 * 1024
+
+# 업로드 재시도 대기 시간
+RETRY_BACKOFF_BASE = 2   # 초, 재시도마다 2배씩 증가
+RETRY_BACKOFF_MAX = 60   # 초
+
+
+class UploadAdapter(HTTPAdapter):
+    """
+    대용량 업로드용 HTTPAdapter
+
+    요청 본문을 UPLOAD_BLOCKSIZE 단위로 읽어 전송해 파이썬 루프와 send 호출 횟수를 줄임
+    (blocksize 옵션은 urllib3 2.x부터 지원)
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        if not urllib3.__version__.startswith('1.'):
+            kwargs.setdefault('blocksize', UPLOAD_BLOCKSIZE)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def mount_upload_adapter(session: requests.Session, pool_maxsize: int = 1):
+    """
+    세션에 UploadAdapter 연결
+
+    동시 업로드 수(pool_maxsize)만큼 keep-alive 연결을 유지 (기본 풀 크기 10보다 크면 연결이 버려짐)
+    urllib3 Retry는 서버에 연결하지 못한 경우만 재시도
+    (POST는 응답 상태 코드나 전송 중 끊김으로는 재시도하지 않으므로, 그런 재시도는 각 스크립트에서 처리)
+    """
+    adapter = UploadAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=5, backoff_factor=0.5)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def get_retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    재시도 대기 시간 (초)
+
+    서버가 Retry-After(초)를 주면 그 값을 사용하고,
+    아니면 지수 백오프에 지터를 더해 여러 작업이 동시에 재시도하지 않도록 함
+    """
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt) + random.uniform(0, 1)
+
+
+def file_sha256(path: Path) -> str:
+    """
+    파일의 SHA-256 계산 (mmap으로 페이지 캐시를 직접 해싱, 해싱 중에는 GIL 해제)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 빈 파일은 mmap 불가
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def set_csrf_headers(host: str, session: requests.Session):
+    """
+    CSRF 헤더를 세션에 한 번만 설정 (HTTPS에서는 Django가 Referer도 검사)
+    """
+    csrf_token = session.cookies.get('csrftoken')
+    if csrf_token:
+        session.headers.update({'X-CSRFToken': csrf_token, 'Referer': host})
@@ -0,0 +1,13 @@
+"""
+File Name Patterns
+
+scripts/init의 스크립트들이 공유하는 비디오 파일명 패턴입니다.
+각 스크립트는 이 파일과 같은 디렉토리에서 실행되므로 `from _patterns import ...`로 사용합니다.
+"""
+
+import re
+
+
+# 파일명 패턴: 100-View1-Part1.mp4
+# Groups: (1)SESSION_ID (단일 Task 스크립트의 VIDEO_ID), (2)VIEW_ID, (3)PART_NUM
+FILE_PATTERN = re.compile(r'^(\d+)-View(\d+)-Part(\d+)\.mp4$', re.IGNORECASE)
@@ -11,9 +11,25 @@ CVAT Multiview 프로젝트의 환경을 체크하는 스크립트입니다.
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 import json
 
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:
+    # packaging이 없으면 최소 버전 비교는 생략
+    Version = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    # requests가 없으면 서버 체크에서 설치 안내만 출력
+    requests = None
+
 # 색상 코드
 GREEN = '\033[92m'
 RED = '\033[91m'
@@ -21,12 +37,29 @@ YELLOW = '\033[93m'
 BLUE = '\033[94m'
 RESET = '\033[0m'
 
+SERVER_URL = 'http://localhost:8080'
+
+# 서버 체크용 공유 세션 (keep-alive 연결 재사용, 연결 실패 시 짧게 재시도)
+SESSION = None
+if requests is not None:
+    SESSION = requests.Session()
+    _adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    )
+    SESSION.mount('http://', _adapter)
+    SESSION.mount('https://', _adapter)
+
+
+def format_header(title):
+    """헤더 문자열 반환"""
+    return f"\n{BLUE}{'='*60}\n{title}\n{'='*60}{RESET}\n"
+
 
 def print_header(title):
     """헤더 출력"""
-    print(f"\n{BLUE}{'='*60}")
-    print(f"{title}")
-    print(f"{'='*60}{RESET}\n")
+    print(format_header(title))
 
 
 def check_mark(condition):
@@ -36,23 +69,23 @@ def check_mark(condition):
 
 def check_python():
     """Python 버전 체크"""
-    print_header("1. Python Environment")
+    lines = [format_header("1. Python Environment")]
 
     version = sys.version_info
     version_str = f"{version.major}.{version.minor}.{version.micro}"
 
     is_valid = version.major == 3 and version.minor >= 8
 
-    print(f"{check_mark(is_valid)} Python Version: {version_str}")
+    lines.append(f"{check_mark(is_valid)} Python Version: {version_str}")
     if not is_valid:
-        print(f"  {YELLOW}[WARNING] Python 3.8 or higher is required{RESET}")
+        lines.append(f"  {YELLOW}[WARNING] Python 3.8 or higher is required{RESET}")
 
-    return is_valid
+    return is_valid, lines
 
 
 def check_packages():
     """필수 Python 패키지 체크"""
-    print_header("2. Python Packages")
+    lines = [format_header("2. Python Packages")]
 
     required_packages = {
         'django': '3.2.0',
@@ -65,34 +98,38 @@ def check_packages():
     all_installed = True
 
     for package, min_version in required_packages.items():
+        # pip 서브프로세스 대신 설치된 배포판 메타데이터를 직접 조회
         try:
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'show', package],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
-            if result.returncode == 0:
-                # 버전 추출
-                for line in result.stdout.split('\n'):
-                    if line.startswith('Version:'):
-                        version = line.split(':')[1].strip()
-                        print(f"{check_mark(True)} {package}: {version}")
-                        break
-            else:
-                print(f"{check_mark(False)} {package}: Not installed")
-                all_installed = False
-        except Exception as e:
-            print(f"{check_mark(False)} {package}: Error checking ({e})")
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            lines.append(f"{check_mark(False)} {package}: Not installed")
             all_installed = False
+            continue
+
+        if Version is None:
+            lines.append(f"{check_mark(True)} {package}: {version}")
+            continue
+
+        # 배포판 패치 빌드 등 PEP 440 형식이 아닌 버전은 비교할 수 없으므로 해당 패키지만 실패 처리
+        try:
+            is_outdated = Version(version) < Version(min_version)
+        except InvalidVersion:
+            lines.append(f"{check_mark(False)} {package}: {version} (cannot parse version, >= {min_version} required)")
+            all_installed = False
+            continue
+
+        if is_outdated:
+            lines.append(f"{check_mark(False)} {package}: {version} (>= {min_version} required)")
+            all_installed = False
+        else:
+            lines.append(f"{check_mark(True)} {package}: {version}")
 
-    return all_installed
+    return all_installed, lines
 
 
 def check_nodejs():
     """Node.js 및 npm 체크"""
-    print_header("3. Node.js Environment")
+    lines = [format_header("3. Node.js Environment")]
 
     # Node.js 체크
     try:
@@ -104,10 +141,10 @@ def check_nodejs():
         )
         node_version = result.stdout.strip()
         node_ok = result.returncode == 0
-        print(f"{check_mark(node_ok)} Node.js: {node_version}")
+        lines.append(f"{check_mark(node_ok)} Node.js: {node_version}")
     except Exception:
         node_ok = False
-        print(f"{check_mark(False)} Node.js: Not installed")
+        lines.append(f"{check_mark(False)} Node.js: Not installed")
 
     # npm 체크
     try:
@@ -119,157 +156,139 @@ def check_nodejs():
         )
         npm_version = result.stdout.strip()
         npm_ok = result.returncode == 0
-        print(f"{check_mark(npm_ok)} npm: {npm_version}")
+        lines.append(f"{check_mark(npm_ok)} npm: {npm_version}")
     except Exception:
         npm_ok = False
-        print(f"{check_mark(False)} npm: Not installed")
+        lines.append(f"{check_mark(False)} npm: Not installed")
 
-    return node_ok and npm_ok
+    return node_ok and npm_ok, lines
 
 
 def check_dataset():
     """데이터셋 파일 체크"""
-    print_header("4. Dataset Files")
+    lines = [format_header("4. Dataset Files")]
 
     dataset_path = Path(r"C:\Users\kimsehun\Desktop\proj\ielab\dataset\multitsf")
 
     # 디렉토리 존재 확인
     if not dataset_path.exists():
-        print(f"{check_mark(False)} Dataset directory not found: {dataset_path}")
-        return False
+        lines.append(f"{check_mark(False)} Dataset directory not found: {dataset_path}")
+        return False, lines
 
-    print(f"{check_mark(True)} Dataset directory: {dataset_path}")
+    lines.append(f"{check_mark(True)} Dataset directory: {dataset_path}")
+
+    # 최상위 디렉토리는 한 번만 읽음 (DirEntry가 stat 정보를 캐시)
+    with os.scandir(dataset_path) as it:
+        entries = {e.name: e for e in it}
 
     # JSON 파일 확인
     json_files = ['train.json', 'test.json', 'all_labels.json']
     json_ok = True
 
     for json_file in json_files:
-        filepath = dataset_path / json_file
-        exists = filepath.exists()
+        entry = entries.get(json_file)
+        exists = entry is not None and entry.is_file()
         json_ok = json_ok and exists
 
         if exists:
-            size_kb = filepath.stat().st_size / 1024
-            print(f"{check_mark(True)} {json_file}: {size_kb:.1f} KB")
+            size_kb = entry.stat().st_size / 1024
+            lines.append(f"{check_mark(True)} {json_file}: {size_kb:.1f} KB")
         else:
-            print(f"{check_mark(False)} {json_file}: Not found")
+            lines.append(f"{check_mark(False)} {json_file}: Not found")
 
-    # 세션 디렉토리 확인
-    session_dirs = [d for d in dataset_path.iterdir() if d.is_dir() and d.name.isdigit()]
+    # 세션 디렉토리 확인 + 비디오 파일 카운트 (세션 디렉토리당 한 번만 읽음)
+    session_dirs = [e for e in entries.values() if e.name.isdigit() and e.is_dir()]
+    video_count = 0
+    for session_dir in session_dirs:
+        with os.scandir(session_dir.path) as it:
+            video_count += sum(1 for e in it if e.name.endswith('.mp4'))
 
     if session_dirs:
-        print(f"\n{check_mark(True)} Session directories found: {len(session_dirs)}")
-
-        # 비디오 파일 카운트
-        video_count = 0
-        for session_dir in session_dirs:
-            videos = list(session_dir.glob('*.mp4'))
-            video_count += len(videos)
-
-        print(f"{check_mark(True)} Total video files: {video_count}")
+        lines.append(f"\n{check_mark(True)} Session directories found: {len(session_dirs)}")
+        lines.append(f"{check_mark(True)} Total video files: {video_count}")
     else:
-        print(f"{check_mark(False)} No session directories found")
-        return False
+        lines.append(f"{check_mark(False)} No session directories found")
+        return False, lines
 
-    return json_ok and len(session_dirs) > 0
+    return json_ok and len(session_dirs) > 0, lines
 
 
 def check_cvat_files():
     """CVAT 파일 수정 확인"""
-    print_header("5. CVAT Modified Files")
+    lines = [format_header("5. CVAT Modified Files")]
 
     cvat_root = Path(r"C:\Users\kimsehun\Desktop\proj\ielab\cvat")
 
     if not cvat_root.exists():
-        print(f"{check_mark(False)} CVAT directory not found: {cvat_root}")
-        return False
-
-    print(f"{check_mark(True)} CVAT directory: {cvat_root}")
-
-    # Backend 파일
-    backend_files = [
-        'cvat/apps/engine/models.py',
-        'cvat/apps/engine/serializers.py',
-        'cvat/apps/engine/views.py',
-    ]
-
-    print(f"\n{BLUE}Backend Files:{RESET}")
-    backend_ok = True
-    for filepath in backend_files:
-        full_path = cvat_root / filepath
-        exists = full_path.exists()
-        backend_ok = backend_ok and exists
-        print(f"  {check_mark(exists)} {filepath}")
-
-    # Frontend 파일
-    frontend_files = [
-        'cvat-ui/src/reducers/index.ts',
-        'cvat-ui/src/reducers/annotation-reducer.ts',
-        'cvat-ui/src/components/annotation-page/multiview-workspace/multiview-workspace.tsx',
-        'cvat-ui/src/components/annotation-page/multiview-workspace/audio-engine.ts',
-        'cvat-ui/src/components/annotation-page/multiview-workspace/spectrogram-panel.tsx',
-    ]
-
-    print(f"\n{BLUE}Frontend Files:{RESET}")
-    frontend_ok = True
-    for filepath in frontend_files:
-        full_path = cvat_root / filepath
-        exists = full_path.exists()
-        frontend_ok = frontend_ok and exists
-        print(f"  {check_mark(exists)} {filepath}")
-
-    # 문서 파일
-    doc_files = [
-        'MULTIVIEW_USAGE.md',
-        'TESTING_MANUAL.md',
-        'QUICKSTART.md',
-        'IMPLEMENTATION_STATUS.md',
-        'SETUP_COMPLETE.md',
-        'FILE_STRUCTURE.md',
-    ]
-
-    print(f"\n{BLUE}Documentation Files:{RESET}")
-    doc_ok = True
-    for filepath in doc_files:
-        full_path = cvat_root / filepath
-        exists = full_path.exists()
-        doc_ok = doc_ok and exists
-        print(f"  {check_mark(exists)} {filepath}")
-
-    return backend_ok and frontend_ok and doc_ok
+        lines.append(f"{check_mark(False)} CVAT directory not found: {cvat_root}")
+        return False, lines
+
+    lines.append(f"{check_mark(True)} CVAT directory: {cvat_root}")
+
+    # 확인할 파일 (분류별)
+    groups = {
+        'Backend': [
+            'cvat/apps/engine/models.py',
+            'cvat/apps/engine/serializers.py',
+            'cvat/apps/engine/views.py',
+        ],
+        'Frontend': [
+            'cvat-ui/src/reducers/index.ts',
+            'cvat-ui/src/reducers/annotation-reducer.ts',
+            'cvat-ui/src/components/annotation-page/multiview-workspace/multiview-workspace.tsx',
+            'cvat-ui/src/components/annotation-page/multiview-workspace/audio-engine.ts',
+            'cvat-ui/src/components/annotation-page/multiview-workspace/spectrogram-panel.tsx',
+        ],
+        'Documentation': [
+            'MULTIVIEW_USAGE.md',
+            'TESTING_MANUAL.md',
+            'QUICKSTART.md',
+            'IMPLEMENTATION_STATUS.md',
+            'SETUP_COMPLETE.md',
+            'FILE_STRUCTURE.md',
+        ],
+    }
+
+    root_str = str(cvat_root)
+    all_ok = True
+    for label, files in groups.items():
+        lines.append(f"\n{BLUE}{label} Files:{RESET}")
+        for filepath in files:
+            exists = os.path.exists(os.path.join(root_str, filepath))
+            all_ok = all_ok and exists
+            lines.append(f"  {check_mark(exists)} {filepath}")
+
+    return all_ok, lines
 
 
 def check_server():
     """CVAT 서버 연결 체크"""
-    print_header("6. CVAT Server")
+    lines = [format_header("6. CVAT Server")]
 
-    try:
-        import requests as req
-    except ImportError:
-        print(f"{check_mark(False)} 'requests' package not installed")
-        print(f"  {YELLOW}Install with: pip install requests{RESET}")
-        return False
+    if SESSION is None:
+        lines.append(f"{check_mark(False)} 'requests' package not installed")
+        lines.append(f"  {YELLOW}Install with: pip install requests{RESET}")
+        return False, lines
 
     try:
-        response = req.get('http://localhost:8080/api/server/about', timeout=5)
-
-        if response.status_code == 200:
-            print(f"{check_mark(True)} Server is running at http://localhost:8080")
-
-            data = response.json()
-            print(f"  Version: {data.get('version', 'Unknown')}")
-            return True
-        else:
-            print(f"{check_mark(False)} Server returned status code: {response.status_code}")
-            return False
-    except req.exceptions.ConnectionError:
-        print(f"{check_mark(False)} Server is not running")
-        print(f"  {YELLOW}Start with: python manage.py runserver 0.0.0.0:8080{RESET}")
-        return False
+        # 응답 본문은 정상 응답일 때만 읽음 (에러 응답 본문은 받지 않음)
+        with SESSION.get(f'{SERVER_URL}/api/server/about', stream=True, timeout=5) as response:
+            if response.status_code == 200:
+                lines.append(f"{check_mark(True)} Server is running at {SERVER_URL}")
+
+                data = response.json()
+                lines.append(f"  Version: {data.get('version', 'Unknown')}")
+                return True, lines
+            else:
+                lines.append(f"{check_mark(False)} Server returned status code: {response.status_code}")
+                return False, lines
+    except requests.exceptions.ConnectionError:
+        lines.append(f"{check_mark(False)} Server is not running")
+        lines.append(f"  {YELLOW}Start with: python manage.py runserver 0.0.0.0:8080{RESET}")
+        return False, lines
     except Exception as e:
-        print(f"{check_mark(False)} Error: {e}")
-        return False
+        lines.append(f"{check_mark(False)} Error: {e}")
+        return False, lines
 
 
 def print_summary(results):
@@ -304,15 +323,27 @@ def main():
     print("=" * 60)
     print(f"{RESET}")
 
-    results = {
-        'Python': check_python(),
-        'Packages': check_packages(),
-        'Node.js': check_nodejs(),
-        'Dataset': check_dataset(),
-        'CVAT Files': check_cvat_files(),
-        'Server': check_server(),
+    # 각 체크는 (통과 여부, 출력 라인)을 반환
+    # Python 체크는 즉시 끝나므로 바로 실행하고, 나머지(서브프로세스/파일/HTTP)는 병렬 실행
+    checks = {
+        'Packages': check_packages,
+        'Node.js': check_nodejs,
+        'Dataset': check_dataset,
+        'CVAT Files': check_cvat_files,
+        'Server': check_server,
     }
 
+    outcomes = {'Python': check_python()}
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {name: executor.submit(fn) for name, fn in checks.items()}
+        outcomes.update((name, future.result()) for name, future in futures.items())
+
+    # 출력 순서는 실행 순서와 무관하게 고정
+    results = {}
+    for name, (ok, lines) in outcomes.items():
+        print("\n".join(lines))
+        results[name] = ok
+
     print_summary(results)
 
     # Exit code
@@ -48,9 +48,23 @@ import requests
 import os
 import sys
 import re
+import threading
+from itertools import groupby
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from http.cookiejar import LWPCookieJar, LoadError
 from pathlib import Path
 from typing import List, Tuple, Optional, Set, Dict
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+
+from _http import file_sha256, mount_upload_adapter, set_csrf_headers
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    # requests-toolbelt가 없으면 requests 기본 multipart 인코딩 사용 (본문 전체를 메모리에 버퍼링)
+    MultipartEncoder = None
 
 
 def parse_session_range(range_str: str) -> List[str]:
@@ -90,33 +104,113 @@ def parse_sessions_arg(sessions: List[str]) -> Set[str]:
 # 기본 설정
 DEFAULT_HOST = "http://localhost:8080"
 DEFAULT_SPLITS = ["test", "train"]
+DEFAULT_PARALLEL = 4
+
+# task 이름 prefix 및 기존 task 조회 시 페이지 크기
+TASK_NAME_PREFIX = "mmoffice_"
+EXISTING_TASKS_PAGE_SIZE = 1000
+
+# 파일명 패턴 (test/train 공용)
+# Test:  split8_id00_s01_recid008.mp4
+# Train: split0_id00_s01_recid000_0.mp4
+# Groups: (1)SPLIT_ID, (2)VIEW_ID, (3)SESSION_ID, (4)REC_ID, (5)PART (train만)
+FILE_PATTERN = re.compile(
+    r'^split(\d+)_id(\d+)_s(\d+)_recid(\d+)(?:_(\d+))?\.mp4$',
+    re.IGNORECASE
+)
+
+# 병렬 업로드 시 여러 스레드의 출력이 섞이지 않도록 보호
+_print_lock = threading.Lock()
+
+
+def log(*lines: str):
+    """여러 줄 메시지를 한 번에 출력 (스레드 간 출력 섞임 방지)"""
+    with _print_lock:
+        print("\n".join(lines), flush=True)
+
+
+# slots=True는 Python 3.10 이상에서만 지원
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class VideoSet:
-    """비디오 세트 정보"""
+    """비디오 세트 정보 (불변)"""
     split: str           # "test" or "train"
     split_id: str        # 예: "8", "0"
     session_id: str      # 예: "01"
     rec_id: str          # 예: "008"
     part: Optional[str]  # 예: "0", "1" (train만 해당)
-    views: List[Path] = field(default_factory=list)  # 뷰 파일들 (VIEW_ID 순으로 정렬)
+    views: Tuple[Path, ...] = ()  # 뷰 파일들 (VIEW_ID 순으로 정렬)
 
     @property
     def task_name(self) -> str:
         """Task 이름 생성"""
-        base = f"mmoffice_{self.split}_split{self.split_id}_s{self.session_id}_recid{self.rec_id}"
+        base = f"{TASK_NAME_PREFIX}{self.split}_split{self.split_id}_s{self.session_id}_recid{self.rec_id}"
         if self.part is not None:
             base += f"_part{self.part}"
         return base
 
 
-def get_auth_session(host: str, username: str, password: str) -> Optional[requests.Session]:
+def load_session_cookies(session: requests.Session, cache_file: Path) -> bool:
+    """캐시 파일에서 세션 쿠키 로드 (파일이 없거나 손상되었으면 False)"""
+    jar = LWPCookieJar(str(cache_file))
+    try:
+        jar.load(ignore_discard=True)
+    except (FileNotFoundError, LoadError):
+        return False
+    session.cookies.update(jar)
+    return True
+
+
+def save_session_cookies(session: requests.Session, cache_file: Path):
+    """세션 쿠키를 캐시 파일에 저장 (본인만 읽을 수 있도록 권한 제한)"""
+    jar = LWPCookieJar(str(cache_file))
+    for cookie in session.cookies:
+        jar.set_cookie(cookie)
+    try:
+        # 새로 만드는 디렉토리/파일은 처음부터 본인 전용 권한으로 생성 (쿠키가 잠시라도 노출되지 않도록)
+        cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            # 이전에 다른 권한으로 만들어진 파일이면 내용을 쓰기 전에 권한 변경
+            os.chmod(cache_file, 0o600)
+            f.write("#LWP-Cookies-2.0\n")
+            f.write(jar.as_lwp_str(ignore_discard=True))
+    except OSError as e:
+        print(f"[WARN] Failed to save session cache: {e}")
+
+
+def is_session_valid(host: str, session: requests.Session) -> bool:
+    """캐시된 세션 쿠키로 인증이 유지되는지 확인"""
+    # /api/server/about은 인증 없이도 200을 반환하므로 인증이 필요한 엔드포인트로 확인
+    try:
+        with session.get(f"{host}/api/users/self", stream=True, timeout=30) as response:
+            return response.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def get_auth_session(
+    host: str,
+    username: str,
+    password: str,
+    cache_file: Optional[Path] = None
+) -> Optional[requests.Session]:
     """
     세션 기반 인증 (로그인 후 세션 쿠키 사용)
+
+    cache_file이 주어지면 저장된 쿠키를 먼저 시도하고, 로그인 성공 시 쿠키를 저장
     """
     session = requests.Session()
 
+    if cache_file is not None and load_session_cookies(session, cache_file):
+        if is_session_valid(host, session):
+            print(f"[OK] Reusing cached session: {cache_file}")
+            set_csrf_headers(host, session)
+            return session
+        session.cookies.clear()
+
     try:
         # CSRF 토큰 획득
         csrf_response = session.get(f"{host}/api/auth/login", timeout=30)
@@ -140,6 +234,9 @@ def get_auth_session(host: str, username: str, password: str) -> Optional[reques
 
         if response.status_code == 200:
             print(f"[OK] Logged in as {username}")
+            set_csrf_headers(host, session)
+            if cache_file is not None:
+                save_session_cookies(session, cache_file)
             return session
         else:
             print(f"[ERROR] Login failed: {response.status_code} - {response.text}")
@@ -149,6 +246,36 @@ def get_auth_session(host: str, username: str, password: str) -> Optional[reques
         return None
 
 
+def fetch_existing_task_names(
+    host: str,
+    session: requests.Session,
+    prefix: str = TASK_NAME_PREFIX,
+    org: Optional[str] = None
+) -> Set[str]:
+    """
+    서버에 이미 있는 task 이름 조회 (prefix로 검색 후 페이지를 따라가며 한 번에 수집)
+    """
+    headers = {'X-Organization': org} if org else {}
+    names: Set[str] = set()
+    url = f"{host}/api/tasks"
+    params: Optional[Dict[str, object]] = {'search': prefix, 'page_size': EXISTING_TASKS_PAGE_SIZE}
+
+    while url:
+        response = session.get(url, params=params, headers=headers, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        # search는 부분 일치이므로 prefix로 시작하는 이름만 사용
+        names.update(
+            t['name'] for t in data.get('results', [])
+            if t.get('name', '').startswith(prefix)
+        )
+        # next URL에 쿼리 파라미터가 이미 포함됨
+        url = data.get('next')
+        params = None
+
+    return names
+
+
 def discover_video_sets(
     data_dir: Path,
     splits: List[str],
@@ -176,20 +303,6 @@ def discover_video_sets(
     if split_ids:
         print(f"  Split ID filter: {sorted(split_ids)}")
 
-    # Test pattern: split8_id00_s01_recid008.mp4
-    # Groups: (1)SPLIT_ID, (2)VIEW_ID, (3)SESSION_ID, (4)REC_ID
-    test_pattern = re.compile(
-        r'^split(\d+)_id(\d+)_s(\d+)_recid(\d+)\.mp4$',
-        re.IGNORECASE
-    )
-
-    # Train pattern: split0_id00_s01_recid000_0.mp4
-    # Groups: (1)SPLIT_ID, (2)VIEW_ID, (3)SESSION_ID, (4)REC_ID, (5)PART
-    train_pattern = re.compile(
-        r'^split(\d+)_id(\d+)_s(\d+)_recid(\d+)_(\d+)\.mp4$',
-        re.IGNORECASE
-    )
-
     mmoffice_dir = data_dir / "mmoffice" / "video"
     if not mmoffice_dir.exists():
         print(f"  [SKIP] MMOffice video dir not found: {mmoffice_dir}")
@@ -201,67 +314,50 @@ def discover_video_sets(
             print(f"  [SKIP] Split not found: {split_dir}")
             continue
 
-        # 모든 mp4 파일 스캔
-        all_files = list(split_dir.glob("*.mp4"))
-        if not all_files:
+        # 모든 mp4 파일 스캔 (Path 객체는 매칭된 파일에 대해서만 생성)
+        with os.scandir(split_dir) as it:
+            entries = [e for e in it if e.name.endswith(".mp4") and e.is_file()]
+        if not entries:
             print(f"  [SKIP] No mp4 files in: {split_dir}")
             continue
 
         print(f"\n  Split: {split}")
-        print(f"  Total files: {len(all_files)}")
-
-        # 파일을 세트 키로 그룹핑
-        # key = (split_id, session_id, rec_id, part)
-        groups: Dict[Tuple[str, str, str, Optional[str]], List[Tuple[str, Path]]] = {}
-
-        for f in all_files:
-            if split == "test":
-                match = test_pattern.match(f.name)
-                if match:
-                    split_id = match.group(1)
-                    view_id = match.group(2)
-                    session_id = match.group(3)
-                    rec_id = match.group(4)
-                    part = None
-                    key = (split_id, session_id, rec_id, part)
-                    if key not in groups:
-                        groups[key] = []
-                    groups[key].append((view_id, f))
-            else:  # train
-                match = train_pattern.match(f.name)
-                if match:
-                    split_id = match.group(1)
-                    view_id = match.group(2)
-                    session_id = match.group(3)
-                    rec_id = match.group(4)
-                    part = match.group(5)  # 0 or 1
-                    key = (split_id, session_id, rec_id, part)
-                    if key not in groups:
-                        groups[key] = []
-                    groups[key].append((view_id, f))
+        print(f"  Total files: {len(entries)}")
 
-        # 각 그룹에서 VideoSet 생성
-        valid_sets = 0
-        for (split_id, session_id, rec_id, part), view_files in sorted(groups.items()):
-            # 세션 필터링
+        # 파일명을 (split_id, session_id, rec_id, part, view_id, path) 레코드로 변환
+        # test는 PART 없는 파일만, train은 PART 있는 파일만 사용
+        is_test = split == "test"
+        records: List[Tuple[str, str, str, Optional[str], str, str]] = []
+
+        for entry in entries:
+            match = FILE_PATTERN.match(entry.name)
+            if not match:
+                continue
+            split_id, view_id, session_id, rec_id, part = match.groups()
+            if (part is None) != is_test:
+                continue
+            # 세션 / split_id 필터링
             if sessions and session_id not in sessions:
                 continue
-
-            # split_id 필터링
             if split_ids and split_id not in split_ids:
                 continue
+            records.append((split_id, session_id, rec_id, part, view_id, entry.path))
 
-            if len(view_files) >= min_views:
-                # VIEW_ID 순으로 정렬
-                sorted_views = sorted(view_files, key=lambda x: x[0])
-                sorted_files = [f for (vid, f) in sorted_views]
+        # 한 번의 정렬로 세트 순서와 세트 내 VIEW_ID 순서를 함께 맞춘 뒤 세트 키로 그룹핑
+        records.sort()
+
+        # 각 그룹에서 VideoSet 생성
+        valid_sets = 0
+        for (split_id, session_id, rec_id, part), group in groupby(records, key=itemgetter(0, 1, 2, 3)):
+            view_paths = [path for *_, path in group]
+            if len(view_paths) >= min_views:
                 video_sets.append(VideoSet(
                     split=split,
                     split_id=split_id,
                     session_id=session_id,
                     rec_id=rec_id,
                     part=part,
-                    views=sorted_files
+                    views=tuple(Path(p) for p in view_paths)
                 ))
                 valid_sets += 1
 
@@ -275,10 +371,13 @@ def create_multiview_task(
     session: requests.Session,
     video_set: VideoSet,
     labels: List[dict] = None,
-    org: str = None
+    org: str = None,
+    checksum: bool = False
 ) -> Optional[dict]:
     """
     Multiview task 생성
+
+    checksum이 True이면 각 뷰의 SHA-256을 view{N}_sha256 필드로 함께 전송
     """
     api_url = f"{host}/api/tasks/create_multiview"
     task_name = video_set.task_name
@@ -287,69 +386,93 @@ def create_multiview_task(
     if labels is None:
         labels = [{"name": "object", "attributes": [], "type": "any"}]
 
-    print(f"\n{'='*60}")
-    print(f"Creating Task: {task_name}")
-    print(f"{'='*60}")
-    print(f"Split: {video_set.split}")
-    print(f"Split ID: {video_set.split_id}")
-    print(f"Session ID: {video_set.session_id}")
-    print(f"Rec ID: {video_set.rec_id}")
+    banner = [
+        f"\n{'='*60}",
+        f"Creating Task: {task_name}",
+        f"{'='*60}",
+        f"Split: {video_set.split}",
+        f"Split ID: {video_set.split_id}",
+        f"Session ID: {video_set.session_id}",
+        f"Rec ID: {video_set.rec_id}",
+    ]
     if video_set.part is not None:
-        print(f"Part: {video_set.part}")
-    print(f"Views: {len(video_set.views)}")
+        banner.append(f"Part: {video_set.part}")
+    banner.append(f"Views: {len(video_set.views)}")
     for i, v in enumerate(video_set.views, 1):
-        print(f"  View{i}: {v.name}")
-    print(f"{'='*60}")
+        banner.append(f"  View{i}: {v.name}")
+    banner.append(f"{'='*60}")
+    banner.append("Sending request...")
+    log(*banner)
 
     try:
-        # 파일 열기
-        files = {}
-        for i, view_path in enumerate(video_set.views, 1):
-            files[f'video_view{i}'] = (view_path.name, open(view_path, 'rb'), 'video/mp4')
-
-        # FormData
-        data = {
-            'name': task_name,
-            'session_id': video_set.session_id,
-            'part_number': video_set.part or '0',
-            'view_count': str(len(video_set.views)),
-        }
-
-        # CSRF 토큰 및 Organization 헤더 추가
-        headers = {}
-        csrf_token = session.cookies.get('csrftoken')
-        if csrf_token:
-            headers['X-CSRFToken'] = csrf_token
-        if org:
-            headers['X-Organization'] = org
-
-        print("Sending request...")
-        response = session.post(
-            api_url,
-            files=files,
-            data=data,
-            headers=headers,
-            timeout=600  # 10분 타임아웃
-        )
-
-        # 파일 닫기
-        for key in files:
-            files[key][1].close()
-
-        if response.status_code == 201:
-            task = response.json()
-            print(f"\n[OK] Task created successfully!")
-            print(f"  ID: {task.get('id')}")
-            print(f"  URL: {host}/tasks/{task.get('id')}")
-            return task
-        else:
-            print(f"\n[ERROR] Failed to create task")
-            print(f"  Status: {response.status_code}")
-            print(f"  Response: {response.text[:500]}")
+        # 업로드 전에 뷰별 내용 해시 계산 (서버가 동일 파일 재처리를 건너뛸 수 있도록)
+        digests = {}
+        if checksum:
+            digests = {
+                f'view{i}_sha256': file_sha256(view_path)
+                for i, view_path in enumerate(video_set.views, 1)
+            }
+
+        with ExitStack() as stack:
+            # 파일 열기 (중간에 예외가 발생해도 ExitStack이 열린 파일을 모두 닫음)
+            files = {
+                f'video_view{i}': (view_path.name, stack.enter_context(open(view_path, 'rb')), 'video/mp4')
+                for i, view_path in enumerate(video_set.views, 1)
+            }
+
+            # FormData
+            data = {
+                'name': task_name,
+                'session_id': video_set.session_id,
+                'part_number': video_set.part or '0',
+                'view_count': str(len(video_set.views)),
+                **digests,
+            }
+
+            # Organization 헤더 추가 (CSRF 헤더는 로그인 시 세션에 설정됨)
+            headers = {}
+            if org:
+                headers['X-Organization'] = org
+
+            if MultipartEncoder is not None:
+                # multipart 본문을 청크 단위로 스트리밍 (뷰 파일 전체를 메모리에 올리지 않음)
+                encoder = MultipartEncoder(fields={**data, **files})
+                headers['Content-Type'] = encoder.content_type
+                body = {'data': encoder}
+            else:
+                body = {'files': files, 'data': data}
+
+            # 응답 본문은 필요한 만큼만 읽도록 stream=True
+            response = session.post(
+                api_url,
+                headers=headers,
+                stream=True,
+                timeout=600,  # 10분 타임아웃
+                **body
+            )
+
+        with response:
+            if response.status_code == 201:
+                # 생성된 task의 id만 사용
+                task_id = response.json().get('id')
+                log(
+                    f"\n[OK] Task created successfully: {task_name}",
+                    f"  ID: {task_id}",
+                    f"  URL: {host}/tasks/{task_id}",
+                )
+                return {'id': task_id}
+
+            # 에러 응답은 앞부분 512바이트만 읽음
+            snippet = next(response.iter_content(512), b'').decode('utf-8', errors='replace')
+            log(
+                f"\n[ERROR] Failed to create task: {task_name}",
+                f"  Status: {response.status_code}",
+                f"  Response: {snippet}",
+            )
             return None
 
     except Exception as e:
-        print(f"\n[ERROR] {type(e).__name__}: {e}")
+        log(f"\n[ERROR] {task_name}: {type(e).__name__}: {e}")
         return None
 
 
@@ -381,6 +504,18 @@ Examples:
       --user admin --password admin123 \\
       --data-dir /mnt/data \\
       --limit 10
+
+  # 동시에 업로드할 task 수 지정 (1이면 순차 생성)
+  python create_mmoffice_tasks.py \\
+      --user admin --password admin123 \\
+      --data-dir /mnt/data \\
+      --parallel 8
+
+  # 로그인 세션 재사용 + 이미 생성된 task 건너뛰기 (중단 후 재실행)
+  python create_mmoffice_tasks.py \\
+      --user admin --password admin123 \\
+      --data-dir /mnt/data \\
+      --session-cache ~/.cvat_session --skip-existing
         """
     )
 
@@ -389,6 +524,8 @@ Examples:
     parser.add_argument('--password', '-p', required=True, help='CVAT password')
     parser.add_argument('--host', default=DEFAULT_HOST, help=f'CVAT host (default: {DEFAULT_HOST})')
     parser.add_argument('--org', help='Organization slug (tasks will be shared with org members)')
+    parser.add_argument('--session-cache', type=Path,
+                        help='Cookie file to reuse the login session across runs (e.g., ~/.cvat_session)')
 
     # 데이터 경로
     parser.add_argument('--data-dir', '-d', required=True,
@@ -410,11 +547,20 @@ Examples:
     parser.add_argument('--min-views', type=int, default=1,
                         help='Minimum number of views per set (default: 1)')
     parser.add_argument('--limit', type=int, help='Limit number of tasks to create')
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL,
+                        help=f'Number of tasks to create concurrently (default: {DEFAULT_PARALLEL})')
+    parser.add_argument('--checksum', action='store_true',
+                        help='Send SHA-256 of each view (view{N}_sha256) with the upload')
+    parser.add_argument('--skip-existing', action='store_true',
+                        help='Skip sets whose task name already exists on the server (applied before --limit)')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be created without actually creating')
 
     args = parser.parse_args()
 
+    if args.parallel < 1:
+        parser.error('--parallel must be at least 1')
+
     # 세션 필터 파싱
     sessions_filter = None
     if args.sessions:
@@ -448,6 +594,35 @@ Examples:
         print("\nNo valid video sets found!")
         sys.exit(1)
 
+    # 세션 기반 인증 (--dry-run은 --skip-existing일 때만 서버에 접속)
+    session = None
+    skipped = 0
+    if not args.dry_run or args.skip_existing:
+        print(f"\nConnecting to {args.host}...")
+        session_cache = args.session_cache.expanduser() if args.session_cache else None
+        session = get_auth_session(args.host, args.user, args.password, session_cache)
+        if not session:
+            print("Authentication failed!")
+            sys.exit(1)
+
+        # 이미 생성된 task 건너뛰기 (중단 후 재실행 시 중복 업로드 방지, --limit보다 먼저 적용)
+        if args.skip_existing:
+            try:
+                existing = fetch_existing_task_names(args.host, session, org=args.org)
+            except (requests.RequestException, ValueError) as e:
+                print(f"[ERROR] Failed to fetch existing tasks: {e}")
+                sys.exit(1)
+            print(f"Existing {TASK_NAME_PREFIX}* tasks on server: {len(existing)}")
+
+            remaining = []
+            for vs in video_sets:
+                if vs.task_name in existing:
+                    print(f"[SKIP] Task already exists: {vs.task_name}")
+                else:
+                    remaining.append(vs)
+            skipped = len(video_sets) - len(remaining)
+            video_sets = remaining
+
     # 제한 적용
     if args.limit and len(video_sets) > args.limit:
         video_sets = video_sets[:args.limit]
@@ -480,32 +655,34 @@ Examples:
         print(f"{'='*60}")
         sys.exit(0)
 
-    # 세션 기반 인증
-    print(f"\nConnecting to {args.host}...")
-    session = get_auth_session(args.host, args.user, args.password)
-    if not session:
-        print("Authentication failed!")
-        sys.exit(1)
+    # 병렬 업로드 수만큼 커넥션 풀 확보 (워커마다 keep-alive 연결 재사용)
+    mount_upload_adapter(session, args.parallel)
 
-    # Task 생성
+    # Task 생성 (세트별 업로드는 서로 독립적이므로 병렬 처리)
     created = 0
     failed = 0
 
-    for vs in video_sets:
-        result = create_multiview_task(
-            host=args.host,
-            session=session,
-            video_set=vs,
-            org=args.org
-        )
-
-        if result:
-            created += 1
-        else:
-            failed += 1
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        futures = [
+            executor.submit(
+                create_multiview_task,
+                host=args.host,
+                session=session,
+                video_set=vs,
+                org=args.org,
+                checksum=args.checksum
+            )
+            for vs in video_sets
+        ]
+
+        for future in as_completed(futures):
+            if future.result():
+                created += 1
+            else:
+                failed += 1
 
     print(f"\n{'='*60}")
-    print(f"Summary: {created} created, {failed} failed")
+    print(f"Summary: {created} created, {failed} failed, {skipped} skipped")
     print(f"{'='*60}")
 
     sys.exit(0 if failed == 0 else 1)
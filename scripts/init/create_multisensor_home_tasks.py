@@ -37,13 +37,28 @@ Task 이름 규칙: multisensor_home1_[SUBDIR]-[SESSION_ID]-Part[PART_NUM]
 """
 
 import argparse
+import logging
 import requests
 import os
 import sys
-import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from pathlib import Path
 from typing import List, Tuple, Optional, Set, Dict
 from dataclasses import dataclass
+from functools import cached_property
+
+from _http import file_sha256, get_retry_delay, mount_upload_adapter, set_csrf_headers
+from _patterns import FILE_PATTERN
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    # requests-toolbelt가 없으면 requests 기본 multipart(전체 본문 메모리 버퍼링)로 전송
+    MultipartEncoder = None
 
 
 def parse_session_range(range_str: str) -> List[str]:
@@ -84,6 +99,45 @@ def parse_sessions_arg(sessions: List[str]) -> Set[str]:
 DEFAULT_HOST = "http://localhost:8080"
 DEFAULT_VIEW_COUNT = 5
 DEFAULT_DATASETS = ["multisensor_home1", "multisensor_home2"]
+DEFAULT_CONCURRENCY = 4
+
+# task별 진행 로그 (병렬 업로드 중에도 레코드 단위로 출력되어 섞이지 않음)
+logger = logging.getLogger(__name__)
+
+# 일시적인 서버 오류 시 업로드 재시도 설정
+DEFAULT_MAX_RETRIES = 3
+RETRY_STATUS_CODES = {502, 503, 504}
+
+# 다음에 업로드할 세트의 파일별로 미리 페이지 캐시에 읽어둘 크기
+PREFETCH_BYTES = 64 * 1024 * 1024
+
+
+class TokenBucket:
+    """
+    토큰 버킷 방식의 요청 속도 제한 (스레드 안전)
+
+    초당 rate개씩 토큰이 채워지고 최대 burst개까지 쌓임
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 
 @dataclass
@@ -93,13 +147,43 @@ class VideoSet:
     subdir: str      # 예: "01"
     session_id: str  # 예: "00"
     part: int        # 예: 1
-    views: List[Path]  # View1부터 View5까지의 파일 경로
+    base: Path       # 비디오 파일이 있는 폴더 (예: /mnt/data/multisensor_home1/01)
+    view_names: Tuple[str, ...]  # View1부터 순서대로의 파일 이름 (탐지 시 스캔한 이름 그대로)
 
     @property
     def task_name(self) -> str:
         """Task 이름 생성"""
         return f"{self.dataset}_{self.subdir}-{self.session_id}-Part{self.part}"
 
+    @property
+    def view_count(self) -> int:
+        return len(self.view_names)
+
+    @cached_property
+    def views(self) -> List[Path]:
+        """View1부터 View{view_count}까지의 파일 경로 (업로드 시 처음 접근할 때 생성)"""
+        return [self.base / name for name in self.view_names]
+
+
+def prefetch_views(video_set: VideoSet):
+    """
+    비디오 세트 파일 앞부분을 커널이 백그라운드로 미리 읽도록 요청
+
+    현재 업로드가 전송되는 동안 다음 세트의 디스크 읽기를 겹쳐서 느린 저장소(NFS 등)의 대기 시간을 줄임
+    (posix_fadvise를 지원하지 않는 OS에서는 아무것도 하지 않음)
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for view_path in video_set.views:
+        try:
+            fd = os.open(view_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
 
 def get_auth_session(host: str, username: str, password: str) -> Optional[requests.Session]:
     """
@@ -130,6 +214,7 @@ def get_auth_session(host: str, username: str, password: str) -> Optional[reques
 
         if response.status_code == 200:
             print(f"[OK] Logged in as {username}")
+            set_csrf_headers(host, session)
             return session
         else:
             print(f"[ERROR] Login failed: {response.status_code} - {response.text}")
@@ -144,15 +229,15 @@ def discover_subdirs(dataset_dir: Path) -> List[str]:
     데이터셋 디렉토리 내의 하위 폴더(01, 02, 03...) 자동 탐지
     숫자로 이루어진 폴더만 반환
     """
-    subdirs = []
     if not dataset_dir.exists():
-        return subdirs
+        return []
 
-    for item in sorted(dataset_dir.iterdir()):
-        if item.is_dir() and item.name.isdigit():
-            subdirs.append(item.name)
+    # 이름 검사를 먼저 해서 숫자 폴더가 아닌 항목은 is_dir() 확인도 생략
+    with os.scandir(dataset_dir) as it:
+        subdirs = [entry.name for entry in it if entry.name.isdigit() and entry.is_dir()]
 
-    return subdirs
+    # 출력 순서를 일정하게 유지
+    return sorted(subdirs)
 
 
 def discover_video_sets(
@@ -161,7 +246,7 @@ def discover_video_sets(
     subdirs: Optional[List[str]] = None,
     view_count: int = DEFAULT_VIEW_COUNT,
     sessions: Optional[Set[str]] = None
-) -> List[VideoSet]:
+) -> Tuple[List[VideoSet], Dict[str, List[VideoSet]]]:
     """
     디렉토리에서 비디오 세트 자동 탐지
 
@@ -169,9 +254,12 @@ def discover_video_sets(
 
     Args:
         sessions: 필터링할 세션 ID Set. None이면 모든 세션 포함
+
+    Returns:
+        (탐지 순서대로의 VideoSet 리스트, "dataset/subdir"별 VideoSet 그룹)
     """
     video_sets = []
-    pattern = re.compile(r'^(\d+)-View(\d+)-Part(\d+)\.mp4$', re.IGNORECASE)
+    by_dataset: Dict[str, List[VideoSet]] = defaultdict(list)
 
     if sessions:
         print(f"  Session filter: {sorted(sessions)}")
@@ -182,7 +270,7 @@ def discover_video_sets(
             print(f"  [SKIP] Dataset not found: {dataset_dir}")
             continue
 
-        # 하위 폴더 탐지
+        # 하위 폴더 탐지 (--subdirs가 지정되면 해당 폴더만 직접 사용하고 전체 목록은 읽지 않음)
         target_subdirs = subdirs if subdirs else discover_subdirs(dataset_dir)
         if not target_subdirs:
             print(f"  [SKIP] No subdirs found in: {dataset_dir}")
@@ -193,58 +281,50 @@ def discover_video_sets(
 
         for subdir in target_subdirs:
             subdir_path = dataset_dir / subdir
-            if not subdir_path.exists():
+            if not subdir_path.is_dir():
                 print(f"    [SKIP] Subdir not found: {subdir_path}")
                 continue
 
-            # 모든 mp4 파일 스캔
-            all_files = list(subdir_path.glob("*.mp4"))
-            if not all_files:
+            # 디렉토리를 한 번만 스캔하면서 파일을 (session_id, part)별로 그룹핑: {view_num: 파일 이름}
+            groups: Dict[Tuple[str, int], Dict[int, str]] = defaultdict(dict)
+            found_mp4 = False
+            with os.scandir(subdir_path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".mp4") or not entry.is_file():
+                        continue
+                    found_mp4 = True
+                    match = FILE_PATTERN.match(entry.name)
+                    if not match:
+                        continue
+                    session_id, view_num, part = match.groups()
+                    # 세션 필터링
+                    if sessions and session_id not in sessions:
+                        continue
+                    groups[(session_id, int(part))][int(view_num)] = entry.name
+            if not found_mp4:
                 print(f"    [SKIP] No mp4 files in: {subdir_path}")
                 continue
 
-            # (session_id, part) 조합 추출
-            combinations: Set[Tuple[str, int]] = set()
-            for f in all_files:
-                match = pattern.match(f.name)
-                if match:
-                    session_id = match.group(1)
-                    part = int(match.group(3))
-                    combinations.add((session_id, part))
-
-            # 각 조합에 대해 VideoSet 생성
+            # View1 ~ View{view_count}가 모두 있는 조합만 VideoSet 생성
+            # (파일 경로 목록은 VideoSet.views에 처음 접근할 때 생성되므로 dry-run에서는 만들지 않음)
             subdir_sets = 0
-            for session_id, part in sorted(combinations):
-                # 세션 필터링
-                if sessions and session_id not in sessions:
-                    continue
-
-                views = []
-                valid = True
-
-                for view_num in range(1, view_count + 1):
-                    filename = f"{session_id}-View{view_num}-Part{part}.mp4"
-                    filepath = subdir_path / filename
-
-                    if filepath.exists():
-                        views.append(filepath)
-                    else:
-                        valid = False
-                        break
-
-                if valid and len(views) == view_count:
-                    video_sets.append(VideoSet(
+            for (session_id, part), views in sorted(groups.items()):
+                if all(view_num in views for view_num in range(1, view_count + 1)):
+                    vs = VideoSet(
                         dataset=dataset,
                         subdir=subdir,
                         session_id=session_id,
                         part=part,
-                        views=views
-                    ))
+                        base=subdir_path,
+                        view_names=tuple(views[view_num] for view_num in range(1, view_count + 1))
+                    )
+                    video_sets.append(vs)
+                    by_dataset[f"{dataset}/{subdir}"].append(vs)
                     subdir_sets += 1
 
             print(f"    {subdir}: {subdir_sets} sets found")
 
-    return video_sets
+    return video_sets, by_dataset
 
 
 def create_multiview_task(
@@ -252,10 +332,19 @@ def create_multiview_task(
     session: requests.Session,
     video_set: VideoSet,
     labels: List[dict] = None,
-    org: str = None
+    org: str = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    prefetch: Optional[VideoSet] = None,
+    checksum: bool = False
 ) -> Optional[dict]:
     """
     Multiview task 생성
+
+    rate_limiter가 주어지면 요청 전에 토큰을 얻을 때까지 대기
+    게이트웨이 오류(502/503/504)나 연결 끊김 시 최대 max_retries번 재시도
+    prefetch가 주어지면 업로드 전에 해당 세트 파일의 미리 읽기를 요청
+    checksum이 True이면 각 뷰의 SHA-256을 view{N}_sha256 필드로 함께 전송
     """
     api_url = f"{host}/api/tasks/create_multiview"
     task_name = video_set.task_name
@@ -264,67 +353,102 @@ def create_multiview_task(
     if labels is None:
         labels = [{"name": "object", "attributes": [], "type": "any"}]
 
-    print(f"\n{'='*60}")
-    print(f"Creating Task: {task_name}")
-    print(f"{'='*60}")
-    print(f"Dataset: {video_set.dataset}")
-    print(f"Subdir: {video_set.subdir}")
-    print(f"Session ID: {video_set.session_id}")
-    print(f"Part: {video_set.part}")
-    print(f"Views: {len(video_set.views)}")
-    for i, v in enumerate(video_set.views, 1):
-        print(f"  View{i}: {v.name}")
-    print(f"{'='*60}")
+    logger.info(
+        "Creating task=%s dataset=%s subdir=%s session=%s part=%d views=%d",
+        task_name, video_set.dataset, video_set.subdir,
+        video_set.session_id, video_set.part, video_set.view_count
+    )
+    # 파일별 상세 정보는 --verbose일 때만 출력
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("task=%s files=%s", task_name, ", ".join(v.name for v in video_set.views))
 
     try:
-        # 파일 열기
-        files = {}
-        for i, view_path in enumerate(video_set.views, 1):
-            files[f'video_view{i}'] = (view_path.name, open(view_path, 'rb'), 'video/mp4')
-
         # FormData
         data = {
             'name': task_name,
             'session_id': video_set.session_id,
             'part_number': str(video_set.part),
-            'view_count': str(len(video_set.views)),
+            'view_count': str(video_set.view_count),
         }
 
-        # CSRF 토큰 및 Organization 헤더 추가
-        headers = {}
-        csrf_token = session.cookies.get('csrftoken')
-        if csrf_token:
-            headers['X-CSRFToken'] = csrf_token
-        if org:
-            headers['X-Organization'] = org
-
-        print("Sending request...")
-        response = session.post(
-            api_url,
-            files=files,
-            data=data,
-            headers=headers,
-            timeout=600  # 10분 타임아웃
-        )
+        # 업로드 전에 뷰별 내용 해시를 한 번만 계산 (재시도 시 재사용, 서버가 동일 파일 재처리를 건너뛸 수 있도록)
+        if checksum:
+            data.update({
+                f'view{i}_sha256': file_sha256(view_path)
+                for i, view_path in enumerate(video_set.views, 1)
+            })
+
+        # 파일 열기 (업로드가 끝나거나 중간에 실패해도 열린 파일은 모두 닫힘)
+        with ExitStack() as stack:
+            files = {
+                f'video_view{i}': (view_path.name, stack.enter_context(open(view_path, 'rb')), 'video/mp4')
+                for i, view_path in enumerate(video_set.views, 1)
+            }
+
+            if prefetch is not None:
+                prefetch_views(prefetch)
+
+            for attempt in range(max_retries + 1):
+                if rate_limiter is not None:
+                    rate_limiter.acquire()
+
+                # 재시도 시 파일을 처음부터 다시 전송
+                if attempt:
+                    for _, f, _ in files.values():
+                        f.seek(0)
+
+                # Organization 헤더 추가 (CSRF 헤더는 로그인 시 세션에 설정됨)
+                headers = {}
+                if org:
+                    headers['X-Organization'] = org
+
+                if MultipartEncoder is not None:
+                    # multipart 본문을 청크 단위로 스트리밍 (뷰 파일 전체를 메모리에 올리지 않음)
+                    encoder = MultipartEncoder(fields={**data, **files})
+                    headers['Content-Type'] = encoder.content_type
+                    body = {'data': encoder}
+                else:
+                    body = {'files': files, 'data': data}
+
+                try:
+                    response = session.post(
+                        api_url,
+                        headers=headers,
+                        timeout=600,  # 10분 타임아웃
+                        **body
+                    )
+                except requests.ConnectionError as e:
+                    # 업로드 도중 연결이 끊긴 경우 (connection reset 등)
+                    if attempt >= max_retries:
+                        raise
+                    reason = type(e).__name__
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                        break
+                    reason = f"Status {response.status_code}"
+                    retry_after = response.headers.get('Retry-After')
 
-        # 파일 닫기
-        for key in files:
-            files[key][1].close()
+                delay = get_retry_delay(attempt, retry_after)
+                logger.warning(
+                    "Retrying task=%s reason=%s delay=%.1fs attempt=%d/%d",
+                    task_name, reason, delay, attempt + 1, max_retries
+                )
+                time.sleep(delay)
 
         if response.status_code == 201:
             task = response.json()
-            print(f"\n[OK] Task created successfully!")
-            print(f"  ID: {task.get('id')}")
-            print(f"  URL: {host}/tasks/{task.get('id')}")
+            logger.info("Created task=%s id=%s url=%s/tasks/%s", task_name, task.get('id'), host, task.get('id'))
             return task
         else:
-            print(f"\n[ERROR] Failed to create task")
-            print(f"  Status: {response.status_code}")
-            print(f"  Response: {response.text[:500]}")
+            logger.error(
+                "Failed task=%s status=%d response=%s",
+                task_name, response.status_code, response.text[:500]
+            )
             return None
 
     except Exception as e:
-        print(f"\n[ERROR] {type(e).__name__}: {e}")
+        logger.error("Failed task=%s error=%s: %s", task_name, type(e).__name__, e)
         return None
 
 
@@ -362,12 +486,18 @@ Examples:
       --user admin --password admin123 \\
       --data-dir /mnt/data \\
       --limit 10
+
+  # 동시에 업로드할 task 수 지정 (1이면 순차 생성)
+  python create_multisensor_tasks.py \\
+      --user admin --password admin123 \\
+      --data-dir /mnt/data \\
+      --concurrency 8
         """
     )
 
     # 인증
-    parser.add_argument('--user', '-u', required=True, help='CVAT username')
-    parser.add_argument('--password', '-p', required=True, help='CVAT password')
+    parser.add_argument('--user', '-u', help='CVAT username (not needed with --dry-run)')
+    parser.add_argument('--password', '-p', help='CVAT password (not needed with --dry-run)')
     parser.add_argument('--host', default=DEFAULT_HOST, help=f'CVAT host (default: {DEFAULT_HOST})')
     parser.add_argument('--org', help='Organization slug (tasks will be shared with org members)')
 
@@ -389,11 +519,44 @@ Examples:
     parser.add_argument('--view-count', type=int, default=DEFAULT_VIEW_COUNT,
                         help=f'Number of views per set (default: {DEFAULT_VIEW_COUNT})')
     parser.add_argument('--limit', type=int, help='Limit number of tasks to create')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Number of tasks to create concurrently (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--max-rps', type=float,
+                        help='Maximum task creation requests per second (default: unlimited)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Number of requests allowed at once before --max-rps applies (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Retries per task on 502/503/504 or connection errors (default: {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--checksum', action='store_true',
+                        help='Send SHA-256 of each view (view{N}_sha256) with the upload')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Show per-file details for each task')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be created without actually creating')
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        stream=sys.stdout
+    )
+    # --verbose는 이 스크립트의 로그에만 적용 (urllib3 등의 디버그 로그는 출력하지 않음)
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    # dry-run은 서버에 접속하지 않으므로 인증 정보 불필요
+    if not args.dry_run and not (args.user and args.password):
+        parser.error('--user and --password are required unless --dry-run is given')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.max_rps is not None and args.max_rps <= 0:
+        parser.error('--max-rps must be positive')
+    if args.burst < 1:
+        parser.error('--burst must be at least 1')
+    if args.max_retries < 0:
+        parser.error('--max-retries must not be negative')
+
     # 세션 필터 파싱
     sessions_filter = None
     if args.sessions:
@@ -409,7 +572,7 @@ Examples:
     print(f"\nScanning for video sets in: {data_dir}")
     print(f"Datasets: {', '.join(args.datasets)}")
 
-    video_sets = discover_video_sets(
+    video_sets, by_dataset = discover_video_sets(
         data_dir=data_dir,
         datasets=args.datasets,
         subdirs=args.subdirs,
@@ -426,19 +589,20 @@ Examples:
         video_sets = video_sets[:args.limit]
         print(f"\nLimited to {args.limit} tasks")
 
+        # 그룹도 탐지 순서대로 같은 개수만 남김
+        remaining = args.limit
+        for key in list(by_dataset):
+            by_dataset[key] = by_dataset[key][:remaining]
+            remaining -= len(by_dataset[key])
+            if not by_dataset[key]:
+                del by_dataset[key]
+
     # 요약 출력
     print(f"\n{'='*60}")
     print(f"Tasks to create: {len(video_sets)}")
     print(f"{'='*60}")
 
-    # 데이터셋별 그룹핑
-    by_dataset: Dict[str, List[VideoSet]] = {}
-    for vs in video_sets:
-        key = f"{vs.dataset}/{vs.subdir}"
-        if key not in by_dataset:
-            by_dataset[key] = []
-        by_dataset[key].append(vs)
-
+    # 데이터셋별 목록 (그룹은 탐지 시 생성됨)
     for key in sorted(by_dataset.keys()):
         sets = by_dataset[key]
         print(f"\n{key}:")
@@ -458,22 +622,39 @@ Examples:
         print("Authentication failed!")
         sys.exit(1)
 
-    # Task 생성
+    # keep-alive 연결을 task 간에 재사용하고, 동시 업로드 수만큼 연결을 유지
+    # (502/503/504 및 업로드 중 연결 끊김 재시도는 create_multiview_task에서 처리)
+    mount_upload_adapter(session, args.concurrency)
+
+    # 서버 부하 조절용 속도 제한 (지정하지 않으면 제한 없음)
+    rate_limiter = TokenBucket(args.max_rps, args.burst) if args.max_rps else None
+
+    # Task 생성 (세트별 업로드는 서로 독립적이므로 병렬 처리)
     created = 0
     failed = 0
 
-    for vs in video_sets:
-        result = create_multiview_task(
-            host=args.host,
-            session=session,
-            video_set=vs,
-            org=args.org
-        )
-
-        if result:
-            created += 1
-        else:
-            failed += 1
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(
+                create_multiview_task,
+                host=args.host,
+                session=session,
+                video_set=vs,
+                org=args.org,
+                rate_limiter=rate_limiter,
+                max_retries=args.max_retries,
+                # 이 task 다음으로 빈 작업 슬롯을 차지할 세트 (동시 실행 수만큼 뒤)
+                prefetch=video_sets[i + args.concurrency] if i + args.concurrency < len(video_sets) else None,
+                checksum=args.checksum
+            )
+            for i, vs in enumerate(video_sets)
+        ]
+
+        for future in as_completed(futures):
+            if future.result():
+                created += 1
+            else:
+                failed += 1
 
     print(f"\n{'='*60}")
     print(f"Summary: {created} created, {failed} failed")
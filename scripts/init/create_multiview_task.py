@@ -17,13 +17,37 @@ import argparse
 import requests
 import os
 import sys
+from contextlib import ExitStack
 from pathlib import Path
 
+from _http import mount_upload_adapter
+from _patterns import FILE_PATTERN
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
+except ImportError:
+    # requests-toolbelt가 없으면 requests 기본 multipart(전체 본문 메모리 버퍼링)로 전송
+    MultipartEncoder = None
+
 # 기본 설정
 DEFAULT_API_URL = "http://localhost:8080/api/tasks/create_multiview"
 DEFAULT_DATASET_PATH = r"C:\Users\kimsehun\Desktop\proj\ielab\dataset\multitsf"
 
 
+def make_progress_callback(step: int = 10):
+    """업로드 진행률을 step(%) 단위로 출력하는 MultipartEncoderMonitor 콜백 생성"""
+    next_percent = step
+
+    def callback(monitor):
+        nonlocal next_percent
+        percent = monitor.bytes_read * 100 // monitor.len
+        if percent >= next_percent:
+            print(f"  Uploaded {percent}% ({monitor.bytes_read / (1024 * 1024):.1f} MB)")
+            next_percent = (percent // step + 1) * step
+
+    return callback
+
+
 def create_multiview_task(
     token: str,
     task_name: str,
@@ -55,30 +79,35 @@ def create_multiview_task(
         print(f"❌ Error: Session directory not found: {session_dir}")
         return None
 
+    # 디렉토리를 한 번만 읽고 파일 존재 여부는 이름 Set으로 확인 (파일별 stat 호출 없음)
+    with os.scandir(session_dir) as it:
+        names = {entry.name for entry in it}
+
     # video_id가 지정되지 않으면 디렉토리에서 첫 번째 유효한 세트 찾기
     if video_id is None:
         print("🔍 Auto-detecting video ID...")
-        all_videos = list(session_dir.glob("*-View1-Part*.mp4"))
-        if not all_videos:
+        # 이름순으로 첫 번째 View1 파일에서 ID 추출 (Set 순회 순서는 실행마다 달라짐)
+        for name in sorted(names):
+            match = FILE_PATTERN.match(name)
+            if match and int(match.group(2)) == 1:
+                video_id = match.group(1)
+                break
+        if video_id is None:
             print(f"❌ Error: No video files found in {session_dir}")
             return None
-
-        # 첫 번째 비디오에서 ID 추출
-        first_video = all_videos[0].name
-        video_id = first_video.split('-')[0]
         print(f"   Found video ID: {video_id}")
 
     # 5개 비디오 파일 경로
-    video_files = {}
+    video_paths = {}
     for view_id in range(1, 6):
         filename = f"{video_id}-View{view_id}-Part{part_number}.mp4"
         filepath = session_dir / filename
 
-        if not filepath.exists():
+        if filename not in names:
             print(f"❌ Error: Video file not found: {filepath}")
             return None
 
-        video_files[f'video_view{view_id}'] = open(filepath, 'rb')
+        video_paths[f'video_view{view_id}'] = filepath
 
     print(f"\n{'='*60}")
     print(f"Creating Multiview Task")
@@ -88,7 +117,7 @@ def create_multiview_task(
     print(f"Part Number: {part_number}")
     print(f"API URL: {api_url}")
     print(f"\nVideo Files:")
-    for key in video_files.keys():
+    for key in video_paths.keys():
         print(f"  ✓ {key}")
     print(f"{'='*60}\n")
 
@@ -106,13 +135,32 @@ def create_multiview_task(
         }
 
         print("Sending request to API...")
-        response = requests.post(
-            api_url,
-            files=video_files,
-            data=data,
-            headers=headers,
-            timeout=300  # 5분 타임아웃
-        )
+        # 업로드가 끝나거나 중간에 실패해도 열린 파일은 모두 닫힘
+        with ExitStack() as stack:
+            video_files = {
+                key: (path.name, stack.enter_context(open(path, 'rb')), 'video/mp4')
+                for key, path in video_paths.items()
+            }
+
+            if MultipartEncoder is not None:
+                # multipart 본문을 청크 단위로 스트리밍하면서 업로드 진행률 표시
+                monitor = MultipartEncoderMonitor(
+                    MultipartEncoder(fields={**data, **video_files}),
+                    make_progress_callback()
+                )
+                headers['Content-Type'] = monitor.content_type
+                body = {'data': monitor}
+            else:
+                body = {'files': video_files, 'data': data}
+
+            session = stack.enter_context(requests.Session())
+            mount_upload_adapter(session)
+            response = session.post(
+                api_url,
+                headers=headers,
+                timeout=300,  # 5분 타임아웃
+                **body
+            )
 
         # 응답 처리
         if response.status_code == 201:
@@ -143,10 +191,6 @@ def create_multiview_task(
     except Exception as e:
         print(f"\n❌ ERROR: {type(e).__name__}: {e}")
         return None
-    finally:
-        # 파일 닫기
-        for f in video_files.values():
-            f.close()
 
 
 def main():
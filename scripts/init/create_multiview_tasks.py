@@ -27,18 +27,139 @@ Multiview task를 배치로 생성하는 스크립트입니다.
 """
 
 import argparse
+import json
+import logging
 import requests
 import os
+import shutil
+import subprocess
 import sys
-import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass
 
+from _http import get_retry_delay, mount_upload_adapter, set_csrf_headers
+from _patterns import FILE_PATTERN
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    # requests-toolbelt가 없으면 requests 기본 multipart(전체 본문 메모리 버퍼링)로 전송
+    MultipartEncoder = None
+
 
 # 기본 설정
 DEFAULT_HOST = "http://localhost:8080"
 DEFAULT_VIEW_COUNT = 5
+DEFAULT_CONCURRENCY = 4
+
+# 자동 탐지 결과 캐시 (데이터 디렉토리가 바뀌지 않았으면 다시 스캔하지 않음)
+CACHE_DIR = Path("~/.cache/cvat-multiview")
+DISCOVERY_CACHE_FILE = CACHE_DIR / "discovery.json"
+# ffprobe 결과 캐시 (파일 크기/mtime이 같으면 다시 읽지 않음)
+PROBE_CACHE_FILE = CACHE_DIR / "probe.json"
+PROBE_WORKERS = 8
+# 한 세트의 뷰끼리 허용하는 길이(초)/FPS 차이
+DURATION_TOLERANCE = 0.1
+FPS_TOLERANCE = 0.01
+
+# 일시적인 서버 오류 시 업로드 재시도 설정
+DEFAULT_MAX_RETRIES = 3
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+# 연속 실패 시 새 업로드를 잠시 중단하는 서킷 브레이커 설정
+DEFAULT_CIRCUIT_THRESHOLD = 5
+DEFAULT_CIRCUIT_COOLDOWN = 60  # 초
+
+# 병렬 업로드 중 task별 진행 상황은 한 줄 로그로 출력 (스레드 간 출력 섞임 방지)
+logger = logging.getLogger(__name__)
+
+
+def advise_sequential(f):
+    """
+    파일을 처음부터 끝까지 순차로 읽는다고 커널에 알림
+
+    커널이 미리 읽기(readahead) 범위를 늘려, 현재 블록을 소켓으로 보내는 동안 다음 블록을 디스크에서 읽어 둠
+    (posix_fadvise를 지원하지 않는 OS에서는 아무것도 하지 않음)
+    """
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+class CircuitBreaker:
+    """
+    서킷 브레이커 (스레드 안전)
+
+    서버 오류가 threshold번 연속되면 OPEN 상태가 되어 cooldown초 동안 새 요청을 대기시키고,
+    cooldown이 지나면 요청 하나만 시험적으로 보냄(HALF_OPEN)
+    시험 요청이 성공하면 CLOSED로 돌아가 대기 중인 요청을 모두 보내고, 실패하면 대기 중인 요청은 실패 처리
+    결과는 요청(세트)당 한 번만 기록해야 함 (재시도마다 기록하면 세트 하나로도 OPEN이 됨)
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_owner: Optional[int] = None  # 시험 요청을 보낸 스레드 ID
+        self._cond = threading.Condition()
+
+    def allow(self) -> bool:
+        """
+        요청을 보내도 되는지 확인
+
+        OPEN 상태면 cooldown이 끝나고 시험 요청 결과가 나올 때까지 대기
+        """
+        with self._cond:
+            opened_at = self.opened_at
+            while True:
+                if self.opened_at is None:
+                    return True
+                if self.opened_at != opened_at:
+                    # 기다리던 시험 요청이 실패해 다시 OPEN됨
+                    return False
+                if self.trial_owner is not None:
+                    self._cond.wait()
+                    continue
+                remaining = self.cooldown - (time.monotonic() - self.opened_at)
+                if remaining <= 0:
+                    self.trial_owner = threading.get_ident()
+                    return True
+                self._cond.wait(remaining)
+
+    def _end_trial(self) -> bool:
+        # 다른 스레드의 결과로 진행 중인 시험 요청이 끝난 것으로 처리하지 않음
+        if self.trial_owner != threading.get_ident():
+            return False
+        self.trial_owner = None
+        return True
+
+    def release(self):
+        """서버 상태와 무관하게 끝난 요청 (결과는 기록하지 않고 시험 요청만 종료)"""
+        with self._cond:
+            self._end_trial()
+            self._cond.notify_all()
+
+    def record_success(self):
+        with self._cond:
+            self.failures = 0
+            self.opened_at = None
+            self._end_trial()
+            self._cond.notify_all()
+
+    def record_failure(self):
+        with self._cond:
+            self.failures += 1
+            was_trial = self._end_trial()
+            # OPEN 전에 시작된 요청의 실패로는 cooldown을 늘리지 않고, 시험 요청이 실패하면 다시 시작
+            if self.failures >= self.threshold and (self.opened_at is None or was_trial):
+                self.opened_at = time.monotonic()
+            self._cond.notify_all()
 
 
 @dataclass
@@ -47,6 +168,7 @@ class VideoSet:
     session_id: str  # 예: "100"
     part: int        # 예: 1
     views: List[Path]  # View1부터 View5까지의 파일 경로
+    metadata: Optional[List[Optional[dict]]] = None  # 뷰별 ffprobe 결과 (--probe 시, 실패한 뷰는 None)
 
 
 def get_session_token(host: str, username: str, password: str) -> Optional[str]:
@@ -98,6 +220,8 @@ def get_auth_session(host: str, username: str, password: str) -> Optional[reques
 
         if response.status_code == 200:
             print(f"[OK] Logged in as {username}")
+            # 로그인 시 CSRF 토큰이 갱신되므로 로그인 후에 설정
+            set_csrf_headers(host, session)
             return session
         else:
             print(f"[ERROR] Login failed: {response.status_code} - {response.text}")
@@ -107,62 +231,230 @@ def get_auth_session(host: str, username: str, password: str) -> Optional[reques
         return None
 
 
-def discover_video_sets(data_dir: Path, view_count: int = DEFAULT_VIEW_COUNT) -> List[VideoSet]:
+def get_token_session(token: str) -> requests.Session:
+    """
+    토큰 기반 인증 (Authorization 헤더 사용)
+
+    로그인/CSRF 요청 없이 바로 세션을 만듦. 토큰 인증 요청에는 CSRF 검사가 적용되지 않음
+    """
+    session = requests.Session()
+    session.headers.update({'Authorization': f'Token {token}'})
+    return session
+
+
+def discover_video_sets(
+    data_dir: Path,
+    view_count: int = DEFAULT_VIEW_COUNT,
+    limit: Optional[int] = None
+) -> List[VideoSet]:
     """
     디렉토리에서 비디오 세트 자동 탐지
 
     파일 명명 규칙: [n]-View[x]-Part[y].mp4
+
+    Args:
+        limit: 최대 세트 수. 정렬 순서상 앞쪽 세트를 limit개 찾으면 나머지 조합은 확인하지 않음
     """
     video_sets = []
-    pattern = re.compile(r'^(\d+)-View(\d+)-Part(\d+)\.mp4$', re.IGNORECASE)
-
-    # 모든 mp4 파일 스캔
-    all_files = list(data_dir.glob("*.mp4"))
-
-    # (session_id, part) 조합 추출
-    combinations: Set[Tuple[str, int]] = set()
-    for f in all_files:
-        match = pattern.match(f.name)
-        if match:
-            session_id = match.group(1)
-            part = int(match.group(3))
-            combinations.add((session_id, part))
-
-    # 각 조합에 대해 VideoSet 생성
-    for session_id, part in sorted(combinations):
-        views = []
-        valid = True
-
-        for view_num in range(1, view_count + 1):
-            filename = f"{session_id}-View{view_num}-Part{part}.mp4"
-            filepath = data_dir / filename
-
-            if filepath.exists():
-                views.append(filepath)
-            else:
-                print(f"  Warning: Missing {filename}")
-                valid = False
-                break
 
-        if valid and len(views) == view_count:
-            video_sets.append(VideoSet(
-                session_id=session_id,
-                part=part,
-                views=views
-            ))
+    # 디렉토리를 한 번만 스캔하면서 (session_id, part)별로 뷰 파일을 그룹핑: {view_num: path}
+    # (파일별 존재 확인 stat 호출 없음, Path 객체는 세트로 확정된 파일에 대해서만 생성)
+    groups: Dict[Tuple[str, int], Dict[int, str]] = defaultdict(dict)
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            match = FILE_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                session_id, view_num, part = match.groups()
+                groups[(session_id, int(part))][int(view_num)] = entry.path
+
+    # View1 ~ View{view_count}가 모두 있는 조합만 VideoSet 생성
+    for (session_id, part), views in sorted(groups.items()):
+        if limit and len(video_sets) >= limit:
+            break
+
+        missing = next((v for v in range(1, view_count + 1) if v not in views), None)
+        if missing is not None:
+            print(f"  Warning: Missing {session_id}-View{missing}-Part{part}.mp4")
+            continue
+
+        video_sets.append(VideoSet(
+            session_id=session_id,
+            part=part,
+            views=[Path(views[view_num]) for view_num in range(1, view_count + 1)]
+        ))
 
     return video_sets
 
 
+def read_cache_file(cache_file: Path) -> dict:
+    """캐시 파일 읽기 (없거나 손상되었으면 빈 dict)"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache_file(cache_file: Path, cache: dict):
+    """캐시 파일 쓰기 (쓰는 도중 중단되어도 기존 캐시가 깨지지 않도록 임시 파일에 쓴 뒤 교체)"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[WARN] Failed to save cache {cache_file}: {e}")
+
+
+def load_discovery_cache(cache_file: Path, data_dir: Path, view_count: int, dir_mtime_ns: int) -> Optional[List[VideoSet]]:
+    """
+    캐시된 자동 탐지 결과 로드
+
+    디렉토리에 파일이 추가/삭제/이름 변경되면 디렉토리 mtime이 바뀌므로,
+    저장 시점의 mtime과 같을 때만 캐시를 사용 (없거나 손상되었거나 바뀌었으면 None)
+    """
+    entry = read_cache_file(cache_file).get(f"{data_dir.resolve()}::{view_count}")
+    if not entry or entry.get('dir_mtime_ns') != dir_mtime_ns:
+        return None
+
+    return [
+        VideoSet(
+            session_id=vs['session_id'],
+            part=vs['part'],
+            views=[data_dir / name for name in vs['views']]
+        )
+        for vs in entry['sets']
+    ]
+
+
+def save_discovery_cache(cache_file: Path, data_dir: Path, view_count: int, dir_mtime_ns: int, video_sets: List[VideoSet]):
+    """
+    자동 탐지 결과를 캐시 파일에 저장 (다른 디렉토리의 캐시 항목은 유지)
+    """
+    cache = read_cache_file(cache_file)
+    cache[f"{data_dir.resolve()}::{view_count}"] = {
+        'dir_mtime_ns': dir_mtime_ns,
+        'sets': [
+            {'session_id': vs.session_id, 'part': vs.part, 'views': [v.name for v in vs.views]}
+            for vs in video_sets
+        ],
+    }
+    write_cache_file(cache_file, cache)
+
+
+def probe_video(path: Path) -> Optional[dict]:
+    """
+    ffprobe로 비디오 메타데이터 추출 (컨테이너/스트림 헤더만 읽고 프레임은 디코딩하지 않음)
+
+    ffprobe가 없거나 실패하면 None
+    """
+    cmd = [
+        'ffprobe', '-v', 'error', '-print_format', 'json',
+        '-show_streams', '-show_format', str(path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
+        data = json.loads(result.stdout)
+
+        video_stream = next((st for st in data.get('streams', []) if st.get('codec_type') == 'video'), None)
+        if not video_stream:
+            return None
+
+        # FPS는 "30000/1001" 같은 분수 형태
+        num, _, den = video_stream.get('r_frame_rate', '0/1').partition('/')
+        fps = float(num) / float(den) if den and float(den) else float(num)
+
+        return {
+            'width': int(video_stream['width']),
+            'height': int(video_stream['height']),
+            'fps': fps,
+            'duration': float(data.get('format', {}).get('duration', 0)),
+        }
+    except (OSError, subprocess.SubprocessError, ValueError, KeyError):
+        return None
+
+
+def probe_video_sets(video_sets: List[VideoSet], cache_file: Optional[Path] = None):
+    """
+    모든 세트의 뷰별 메타데이터를 VideoSet.metadata에 채움
+
+    cache_file이 주어지면 (경로, mtime, 크기)가 같은 파일은 캐시된 결과를 사용하고 ffprobe를 실행하지 않음
+    """
+    cache = read_cache_file(cache_file) if cache_file else {}
+    cache_updated = False
+
+    def probe(path: Path) -> Optional[dict]:
+        nonlocal cache_updated
+        # 탐지 후 삭제되었거나 읽을 수 없는 파일은 probe_video 실패와 같이 None으로 보고 검증에서 처리
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = str(path.absolute())
+        entry = cache.get(key)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry['meta']
+
+        meta = probe_video(path)
+        # 실패한 결과는 캐시하지 않음 (ffprobe 설치 후 다시 시도되도록)
+        if meta is not None:
+            cache[key] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'meta': meta}
+            cache_updated = True
+        return meta
+
+    # ffprobe는 별도 프로세스이므로 여러 파일을 동시에 조회
+    paths = [view for vs in video_sets for view in vs.views]
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+        metas = iter(list(executor.map(probe, paths)))
+
+    for vs in video_sets:
+        vs.metadata = [next(metas) for _ in vs.views]
+
+    if cache_file and cache_updated:
+        write_cache_file(cache_file, cache)
+
+
+def validate_video_set(video_set: VideoSet) -> Optional[str]:
+    """
+    세트의 모든 뷰가 같은 FPS와 길이(DURATION_TOLERANCE 이내)인지 확인
+
+    문제가 있으면 이유 문자열, 정상이거나 메타데이터가 없으면(--probe 미사용) None
+    """
+    if video_set.metadata is None:
+        return None
+
+    for i, meta in enumerate(video_set.metadata, 1):
+        if meta is None:
+            return f"View{i} could not be probed"
+
+    fps_values = [meta['fps'] for meta in video_set.metadata]
+    if max(fps_values) - min(fps_values) > FPS_TOLERANCE:
+        return "FPS mismatch: " + ", ".join(f"View{i}={fps:.2f}" for i, fps in enumerate(fps_values, 1))
+
+    durations = [meta['duration'] for meta in video_set.metadata]
+    if max(durations) - min(durations) > DURATION_TOLERANCE:
+        return "Duration mismatch: " + ", ".join(f"View{i}={d:.2f}s" for i, d in enumerate(durations, 1))
+
+    return None
+
+
 def create_multiview_task(
     host: str,
     session: requests.Session,
     task_name: str,
     video_set: VideoSet,
-    labels: List[dict] = None
+    labels: List[dict] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    breaker: Optional[CircuitBreaker] = None
 ) -> Optional[dict]:
     """
     Multiview task 생성
+
+    뷰 메타데이터 검증(validate_video_set)은 main에서 업로드 전에 한 번만 수행
+    429/502/503/504 응답이나 연결 끊김 시 최대 max_retries번 재시도
+    breaker가 주어지면 서버 오류가 연속될 때 cooldown 후 시험 요청 결과가 나올 때까지 대기하고
+    (시험 요청이 실패하면 업로드를 보내지 않고 실패 처리), 재시도가 끝난 뒤 세트당 한 번만 결과를 기록
     """
     api_url = f"{host}/api/tasks/create_multiview"
 
@@ -170,22 +462,21 @@ def create_multiview_task(
     if labels is None:
         labels = [{"name": "object", "attributes": [], "type": "any"}]
 
-    print(f"\n{'='*60}")
-    print(f"Creating Task: {task_name}")
-    print(f"{'='*60}")
-    print(f"Session ID: {video_set.session_id}")
-    print(f"Part: {video_set.part}")
-    print(f"Views: {len(video_set.views)}")
-    for i, v in enumerate(video_set.views, 1):
-        print(f"  View{i}: {v.name}")
-    print(f"{'='*60}")
+    logger.info(
+        "Creating task=%s session=%s part=%d views=%d",
+        task_name, video_set.session_id, video_set.part, len(video_set.views)
+    )
+    # 파일별 상세 정보는 --verbose일 때만 출력
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("task=%s files=%s", task_name, ", ".join(v.name for v in video_set.views))
 
-    try:
-        # 파일 열기
-        files = {}
-        for i, view_path in enumerate(video_set.views, 1):
-            files[f'video_view{i}'] = (view_path.name, open(view_path, 'rb'), 'video/mp4')
+    if breaker is not None and not breaker.allow():
+        logger.warning("Skipped task=%s reason=circuit open (server still failing after cooldown)", task_name)
+        return None
 
+    # 서버 장애 여부 (None: 서버 응답과 무관하게 실패)
+    server_failed: Optional[bool] = None
+    try:
         # FormData
         data = {
             'name': task_name,
@@ -193,41 +484,88 @@ def create_multiview_task(
             'part_number': str(video_set.part),
         }
 
-        # CSRF 토큰 추가
-        headers = {}
-        csrf_token = session.cookies.get('csrftoken')
-        if csrf_token:
-            headers['X-CSRFToken'] = csrf_token
+        # 파일 열기 (업로드가 끝나거나 중간에 실패해도 열린 파일은 모두 닫힘)
+        with ExitStack() as stack:
+            files = {
+                f'video_view{i}': (view_path.name, stack.enter_context(open(view_path, 'rb')), 'video/mp4')
+                for i, view_path in enumerate(video_set.views, 1)
+            }
+            for _, f, _ in files.values():
+                advise_sequential(f)
+
+            for attempt in range(max_retries + 1):
+                # 재시도 시 파일을 처음부터 다시 전송
+                if attempt:
+                    for _, f, _ in files.values():
+                        f.seek(0)
+
+                # CSRF 헤더는 로그인 시 세션에 설정됨
+                headers = {}
+
+                if MultipartEncoder is not None:
+                    # multipart 본문을 청크 단위로 스트리밍 (뷰 파일 전체를 메모리에 올리지 않음)
+                    encoder = MultipartEncoder(fields={**data, **files})
+                    headers['Content-Type'] = encoder.content_type
+                    body = {'data': encoder}
+                else:
+                    body = {'files': files, 'data': data}
+
+                try:
+                    response = session.post(
+                        api_url,
+                        headers=headers,
+                        timeout=600,  # 10분 타임아웃
+                        **body
+                    )
+                except requests.ConnectionError as e:
+                    # 업로드 도중 연결이 끊긴 경우 (connection reset 등)
+                    if attempt >= max_retries:
+                        raise
+                    reason = type(e).__name__
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                        break
+                    reason = f"Status {response.status_code}"
+                    retry_after = response.headers.get('Retry-After')
 
-        print("Sending request...")
-        response = session.post(
-            api_url,
-            files=files,
-            data=data,
-            headers=headers,
-            timeout=600  # 10분 타임아웃
-        )
+                delay = get_retry_delay(attempt, retry_after)
+                logger.warning(
+                    "Retrying task=%s reason=%s delay=%.1fs attempt=%d/%d",
+                    task_name, reason, delay, attempt + 1, max_retries
+                )
+                time.sleep(delay)
 
-        # 파일 닫기
-        for key in files:
-            files[key][1].close()
+        # 과부하(429)나 5xx만 서버 장애로 보고, 4xx 요청 오류는 서버가 정상 응답한 것으로 봄
+        server_failed = response.status_code in RETRY_STATUS_CODES or response.status_code >= 500
 
         if response.status_code == 201:
             task = response.json()
-            print(f"\n[OK] Task created successfully!")
-            print(f"  ID: {task.get('id')}")
-            print(f"  URL: {host}/tasks/{task.get('id')}")
+            logger.info("Created task=%s id=%s url=%s/tasks/%s", task_name, task.get('id'), host, task.get('id'))
             return task
         else:
-            print(f"\n[ERROR] Failed to create task")
-            print(f"  Status: {response.status_code}")
-            print(f"  Response: {response.text[:500]}")
+            logger.error(
+                "Failed task=%s status=%d response=%s",
+                task_name, response.status_code, response.text[:500]
+            )
             return None
 
     except Exception as e:
-        print(f"\n[ERROR] {type(e).__name__}: {e}")
+        # 연결 끊김/타임아웃은 서버 장애로 보고, 파일 읽기 오류 등은 서버 상태와 무관하게 봄
+        if isinstance(e, requests.RequestException):
+            server_failed = True
+        logger.error("Failed task=%s error=%s: %s", task_name, type(e).__name__, e)
         return None
 
+    finally:
+        if breaker is not None:
+            if server_failed is None:
+                breaker.release()
+            elif server_failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -247,15 +585,28 @@ Examples:
   python create_multiview_tasks.py --user admin --password admin123 \\
       --data-dir ./videos --auto-detect
 
+  # 자동 탐지 캐시를 무시하고 다시 스캔
+  python create_multiview_tasks.py --user admin --password admin123 \\
+      --data-dir ./videos --auto-detect --refresh-cache
+
   # 생성할 task 수 제한
   python create_multiview_tasks.py --user admin --password admin123 \\
       --data-dir ./videos --auto-detect --limit 3
+
+  # API 토큰으로 인증 (로그인 요청 생략)
+  python create_multiview_tasks.py --token YOUR_TOKEN \\
+      --data-dir ./videos --auto-detect
+
+  # 8개씩 동시에 생성
+  python create_multiview_tasks.py --user admin --password admin123 \\
+      --data-dir ./videos --auto-detect --concurrency 8
         """
     )
 
-    # 인증
-    parser.add_argument('--user', '-u', required=True, help='CVAT username')
-    parser.add_argument('--password', '-p', required=True, help='CVAT password')
+    # 인증 (--token 또는 --user/--password)
+    parser.add_argument('--user', '-u', help='CVAT username')
+    parser.add_argument('--password', '-p', help='CVAT password')
+    parser.add_argument('--token', help='CVAT API token (skips the login request)')
     parser.add_argument('--host', default=DEFAULT_HOST, help=f'CVAT host (default: {DEFAULT_HOST})')
 
     # 데이터
@@ -273,13 +624,50 @@ Examples:
     parser.add_argument('--auto-detect', action='store_true',
                         help='Auto-detect all video sets in directory')
     parser.add_argument('--limit', type=int, help='Limit number of tasks to create')
+    parser.add_argument('--probe', action='store_true',
+                        help='Check with ffprobe that all views of a set have the same fps/duration before uploading')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write the auto-detect/probe caches ({CACHE_DIR})')
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help='Rescan the directory and overwrite the auto-detect cache')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Number of tasks to create concurrently (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Retries per task on 429/502/503/504 or connection errors (default: {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_CIRCUIT_THRESHOLD,
+                        help=f'Pause uploads after this many consecutive tasks fail with server errors (default: {DEFAULT_CIRCUIT_THRESHOLD})')
+    parser.add_argument('--circuit-cooldown', type=float, default=DEFAULT_CIRCUIT_COOLDOWN,
+                        help=f'Seconds to hold pending uploads before trying the server again (default: {DEFAULT_CIRCUIT_COOLDOWN})')
 
     # Task 설정
     parser.add_argument('--name-prefix', default='Multiview', help='Task name prefix')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Show per-file details for each task')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be created without actually creating')
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        stream=sys.stdout
+    )
+    # --verbose는 이 스크립트의 로그에만 적용 (urllib3 등의 디버그 로그는 출력하지 않음)
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    # dry-run은 서버에 접속하지 않으므로 인증 정보 불필요
+    if not args.dry_run and not args.token and not (args.user and args.password):
+        parser.error('--token or --user and --password are required unless --dry-run is given')
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.max_retries < 0:
+        parser.error('--max-retries must not be negative')
+    if args.circuit_threshold < 1:
+        parser.error('--circuit-threshold must be at least 1')
+    if args.circuit_cooldown < 0:
+        parser.error('--circuit-cooldown must not be negative')
+
     data_dir = Path(args.data_dir)
     if not data_dir.exists():
         print(f"Error: Data directory not found: {data_dir}")
@@ -290,7 +678,22 @@ Examples:
 
     if args.auto_detect:
         print(f"Auto-detecting video sets in {data_dir}...")
-        video_sets = discover_video_sets(data_dir, args.view_count)
+        cache_file = DISCOVERY_CACHE_FILE.expanduser()
+        # 스캔 전에 mtime을 읽어 스캔 중 변경된 내용은 다음 실행에서 다시 스캔되도록 함
+        dir_mtime_ns = data_dir.stat().st_mtime_ns
+
+        cached = None
+        if not args.no_cache and not args.refresh_cache:
+            cached = load_discovery_cache(cache_file, data_dir, args.view_count, dir_mtime_ns)
+
+        if cached is not None:
+            video_sets = cached
+            print("Loaded video sets from cache (directory unchanged)")
+        else:
+            video_sets = discover_video_sets(data_dir, args.view_count, args.limit)
+            # --limit으로 일부만 탐지한 결과는 캐시하지 않음
+            if not args.no_cache and not args.limit:
+                save_discovery_cache(cache_file, data_dir, args.view_count, dir_mtime_ns, video_sets)
         print(f"Found {len(video_sets)} complete video sets")
     else:
         # 수동 지정 모드
@@ -301,15 +704,18 @@ Examples:
             print("Error: Specify --session-id/--session-ids and --part/--parts, or use --auto-detect")
             sys.exit(1)
 
+        # 디렉토리를 한 번만 스캔해 파일 이름으로 확인 (세션 x 파트 x 뷰마다 stat 호출하지 않음)
+        with os.scandir(data_dir) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+
         for sid in session_ids:
             for part in parts:
                 views = []
                 valid = True
                 for view_num in range(1, args.view_count + 1):
                     filename = f"{sid}-View{view_num}-Part{part}.mp4"
-                    filepath = data_dir / filename
-                    if filepath.exists():
-                        views.append(filepath)
+                    if filename in names:
+                        views.append(data_dir / filename)
                     else:
                         print(f"Warning: Missing {filename}")
                         valid = False
@@ -327,43 +733,88 @@ Examples:
         video_sets = video_sets[:args.limit]
         print(f"Limited to {args.limit} tasks")
 
+    # 뷰별 길이/FPS 조회 및 검증 (제한 적용 후 실제로 생성할 세트만)
+    # 뷰끼리 맞지 않는 세트는 업로드하지 않음
+    invalid = 0
+    if args.probe and shutil.which('ffprobe') is None:
+        print("\n[WARN] ffprobe not found, skipping video validation")
+    elif args.probe:
+        print(f"\nProbing {sum(len(vs.views) for vs in video_sets)} video files...")
+        probe_video_sets(video_sets, None if args.no_cache else PROBE_CACHE_FILE.expanduser())
+
+        valid_sets = []
+        for vs in video_sets:
+            error = validate_video_set(vs)
+            if error:
+                print(f"  [INVALID] {vs.session_id}-Part{vs.part}: {error}")
+            else:
+                valid_sets.append(vs)
+        invalid = len(video_sets) - len(valid_sets)
+        print(f"Valid sets: {len(valid_sets)}, invalid sets: {invalid}")
+        video_sets = valid_sets
+
+        if not video_sets:
+            print("No valid video sets to create!")
+            sys.exit(1)
+
     print(f"\nTasks to create: {len(video_sets)}")
     for vs in video_sets:
-        print(f"  - {vs.session_id}-Part{vs.part}")
+        info = ""
+        if vs.metadata and vs.metadata[0]:
+            info = f" ({vs.metadata[0]['duration']:.1f}s, {vs.metadata[0]['fps']:.2f} fps)"
+        print(f"  - {vs.session_id}-Part{vs.part}{info}")
 
     if args.dry_run:
         print("\n[DRY RUN] No tasks created.")
         sys.exit(0)
 
-    # 세션 기반 인증
-    session = get_auth_session(args.host, args.user, args.password)
+    # 토큰이 있으면 토큰 인증, 없으면 세션 기반 인증
+    if args.token:
+        session = get_token_session(args.token)
+    else:
+        session = get_auth_session(args.host, args.user, args.password)
     if not session:
         print("Authentication failed!")
         sys.exit(1)
 
-    # Task 생성
+    # 동시 업로드 수만큼 keep-alive 연결을 유지
+    # (429/502/503/504 및 업로드 중 연결 끊김 재시도는 create_multiview_task에서 처리)
+    mount_upload_adapter(session, args.concurrency)
+
+    # 서버 오류가 연속되면 남은 업로드를 보내지 않도록 모든 작업이 공유
+    breaker = CircuitBreaker(args.circuit_threshold, args.circuit_cooldown)
+
+    # Task 생성 (세트별 업로드는 서로 독립적이므로 병렬 처리)
     created = 0
     failed = 0
 
-    for vs in video_sets:
-        task_name = f"{args.name_prefix}-{vs.session_id}-Part{vs.part}"
-        result = create_multiview_task(
-            host=args.host,
-            session=session,
-            task_name=task_name,
-            video_set=vs
-        )
-
-        if result:
-            created += 1
-        else:
-            failed += 1
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(
+                create_multiview_task,
+                host=args.host,
+                session=session,
+                task_name=f"{args.name_prefix}-{vs.session_id}-Part{vs.part}",
+                video_set=vs,
+                max_retries=args.max_retries,
+                breaker=breaker
+            )
+            for vs in video_sets
+        ]
+
+        # 완료될 때마다 전체 진행 상황을 한 줄로 출력
+        for done, future in enumerate(as_completed(futures), 1):
+            if future.result():
+                created += 1
+            else:
+                failed += 1
+            logger.info("Progress %d/%d (created=%d failed=%d)", done, len(futures), created, failed)
 
     print(f"\n{'='*60}")
-    print(f"Summary: {created} created, {failed} failed")
+    print(f"Summary: {created} created, {failed} failed, {invalid} invalid")
     print(f"{'='*60}")
 
-    sys.exit(0 if failed == 0 else 1)
+    sys.exit(0 if failed == 0 and invalid == 0 else 1)
 
 
 if __name__ == '__main__':
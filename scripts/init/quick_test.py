@@ -11,9 +11,22 @@ Quick Test Script
 
 import requests
 import json
+import os
+from contextlib import ExitStack
 from pathlib import Path
 import sys
 
+from _patterns import FILE_PATTERN
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    # requests-toolbelt가 없으면 requests 기본 multipart(전체 본문 메모리 버퍼링)로 전송
+    MultipartEncoder = None
+
+# 서버 체크, 토큰 검증, 업로드, 조회가 같은 keep-alive 연결을 재사용하도록 공유하는 세션
+SESSION = requests.Session()
+
 # 색상 코드
 GREEN = '\033[92m'
 RED = '\033[91m'
@@ -38,7 +51,7 @@ def check_server():
     print(f"{BLUE}Checking CVAT server...{RESET}")
 
     try:
-        response = requests.get('http://localhost:8080/api/server/about', timeout=5)
+        response = SESSION.get('http://localhost:8080/api/server/about', timeout=5)
         if response.status_code == 200:
             data = response.json()
             print(f"{GREEN}[OK] Server is running{RESET}")
@@ -70,7 +83,7 @@ def get_token():
 
     # 토큰 검증
     try:
-        response = requests.get(
+        response = SESSION.get(
             'http://localhost:8080/api/users/self',
             headers={'Authorization': f'Token {token}'},
             timeout=5
@@ -137,20 +150,13 @@ def check_dataset():
     # 비디오 ID와 파트 조합 찾기
     video_sets = {}  # {video_id: {part_number: [view1, view2, ...]}}
 
-    for video in session_dir.glob('*.mp4'):
-        parts = video.stem.split('-')
-        if len(parts) >= 3:
-            video_id = parts[0]
-            view_str = parts[1].replace('View', '')
-            part_str = parts[2].replace('Part', '')
-
-            if view_str.isdigit() and part_str.isdigit():
-                if video_id not in video_sets:
-                    video_sets[video_id] = {}
-                part_num = int(part_str)
-                if part_num not in video_sets[video_id]:
-                    video_sets[video_id][part_num] = []
-                video_sets[video_id][part_num].append(int(view_str))
+    with os.scandir(session_dir) as it:
+        for entry in it:
+            match = FILE_PATTERN.match(entry.name)
+            if not match:
+                continue
+            video_id, view_id, part_num = match.groups()
+            video_sets.setdefault(video_id, {}).setdefault(int(part_num), []).append(int(view_id))
 
     if not video_sets:
         print(f"{RED}[FAIL] No valid video sets found in {session_dir}{RESET}")
@@ -233,8 +239,6 @@ def create_task(token, session_id, part_number, video_files):
     print(f"  Part: {part_number}")
 
     # FormData 준비
-    files = {key: open(path, 'rb') for key, path in video_files.items()}
-
     data = {
         'name': task_name,
         'session_id': session_id,
@@ -248,13 +252,27 @@ def create_task(token, session_id, part_number, video_files):
     try:
         print(f"\n{YELLOW}Uploading videos... (this may take a while){RESET}")
 
-        response = requests.post(
-            'http://localhost:8080/api/tasks/create_multiview',
-            files=files,
-            data=data,
-            headers=headers,
-            timeout=300
-        )
+        # 업로드가 끝나거나 중간에 실패해도 열린 파일은 모두 닫힘
+        with ExitStack() as stack:
+            files = {
+                key: (path.name, stack.enter_context(open(path, 'rb')), 'video/mp4')
+                for key, path in video_files.items()
+            }
+
+            if MultipartEncoder is not None:
+                # multipart 본문을 청크 단위로 스트리밍 (뷰 파일 전체를 메모리에 올리지 않음)
+                encoder = MultipartEncoder(fields={**data, **files})
+                headers['Content-Type'] = encoder.content_type
+                body = {'data': encoder}
+            else:
+                body = {'files': files, 'data': data}
+
+            response = SESSION.post(
+                'http://localhost:8080/api/tasks/create_multiview',
+                headers=headers,
+                timeout=300,
+                **body
+            )
 
         if response.status_code == 201:
             task = response.json()
@@ -285,9 +303,6 @@ def create_task(token, session_id, part_number, video_files):
     except Exception as e:
         print(f"\n{RED}✗ Error: {e}{RESET}")
         return None
-    finally:
-        for f in files.values():
-            f.close()
 
 
 def test_multiview_data(token, task_id):
@@ -295,7 +310,7 @@ def test_multiview_data(token, task_id):
     print(f"\n{BLUE}Step 4: Test Multiview Data API{RESET}")
 
     try:
-        response = requests.get(
+        response = SESSION.get(
             f'http://localhost:8080/api/tasks/{task_id}/multiview_data',
             headers={'Authorization': f'Token {token}'},
             timeout=10